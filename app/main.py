@@ -1,13 +1,35 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.routers import tasks, debug
+from fastapi.middleware.gzip import GZipMiddleware
+from app.routers import tasks, debug, macros, metrics, jobs
+from app.services.adaptive_timeouts import adaptive_timeouts
+from app.services.asset_cache import asset_cache
+from app.utils.config import settings
+from app.utils.log import setup_logging
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging(settings.LOG_LEVEL, settings.LOG_FORMAT)
+    yield
+    asset_cache.flush()
+    adaptive_timeouts.flush()
+
 app = FastAPI(
     title="Softlight Agent",
     description="Captures UI states in real time.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+if settings.RESPONSE_GZIP:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.RESPONSE_GZIP_MIN_BYTES)
+
 app.include_router(tasks.router)
 app.include_router(debug.router)
+app.include_router(macros.router)
+app.include_router(metrics.router)
+app.include_router(jobs.router)
 
 @app.get("/")
 async def root():
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
 
 class Step(BaseModel):
     action: str
@@ -8,13 +8,68 @@ class Step(BaseModel):
     value: Optional[str] = None
     url: Optional[str] = None
     screenshot_path: Optional[str] = None
+    input_mode: Optional[str] = None
+    page_state_id: Optional[str] = None
 
 class TaskRequest(BaseModel):
     app: str
     instruction: str
+    record_macro: Optional[str] = None
+    include_timings: bool = False
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)
 
 class TaskResponse(BaseModel):
     status: str
     app: str
     instruction: str
-    steps: List[Step]
\ No newline at end of file
+    steps: List[Step]
+    timings: Optional[Dict[str, float]] = None
+    page_states: Optional[Dict[str, Dict[str, Any]]] = None
+
+class BatchTaskRequest(BaseModel):
+    app: str
+    instructions: List[str]
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)
+
+class BatchTaskResult(TaskResponse):
+    duration_ms: float
+
+class BatchTiming(BaseModel):
+    planning_ms: float
+    execution_ms: float
+    total_ms: float
+
+class BatchTaskResponse(BaseModel):
+    status: str
+    app: str
+    results: List[BatchTaskResult]
+    timing: BatchTiming
+
+class MacroReplayRequest(BaseModel):
+    params: Dict[str, str] = {}
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)
+
+class JobRequest(TaskRequest):
+    workspace: Optional[str] = None
+
+class JobResponse(BaseModel):
+    id: str
+    status: str
+    app: str
+    instruction: str
+    workspace: Optional[str] = None
+    worker_id: Optional[str] = None
+    attempts: int = 0
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[TaskResponse] = None
+    error: Optional[str] = None
+
+class WorkerInfo(BaseModel):
+    id: str
+    host: str
+    capacity: int
+    active: int
+    warm_workspaces: List[str]
+    heartbeat_at: float
@@ -1,6 +1,4 @@
 from fastapi import APIRouter
-from playwright.async_api import async_playwright
-import os
 
 router = APIRouter(prefix="/debug", tags=["Debug"])
 @router.post("/test-llm-detailed")
@@ -26,4 +24,16 @@ async def test_llm_detailed(request: dict):
             "error": str(e),
             "app": app,
             "instruction": instruction
-        }
\ No newline at end of file
+        }
+
+@router.get("/asset-cache")
+async def asset_cache_stats():
+    from app.services.asset_cache import asset_cache
+
+    return asset_cache.stats()
+
+@router.get("/timeouts")
+async def adaptive_timeout_stats():
+    from app.services.adaptive_timeouts import adaptive_timeouts
+
+    return adaptive_timeouts.stats()
@@ -0,0 +1,33 @@
+import asyncio
+from typing import List
+from fastapi import APIRouter, HTTPException
+from app.models.task_models import JobRequest, JobResponse, WorkerInfo
+from app.services.job_queue import job_queue
+from app.services.macro_service import macro_service
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+@router.post("", response_model=JobResponse, status_code=202)
+async def enqueue_job(request: JobRequest):
+    if not request.app or not request.instruction:
+        raise HTTPException(status_code=400, detail="Both 'app' and 'instruction' are required.")
+    if request.record_macro and not macro_service.is_valid_name(request.record_macro):
+        raise HTTPException(status_code=400, detail="Macro names may only contain letters, digits, '-' and '_'.")
+    if request.workspace and not job_queue.is_valid_workspace(request.workspace):
+        raise HTTPException(status_code=400, detail="Workspace names may only contain letters, digits, '-' and '_'.")
+
+    return await asyncio.to_thread(
+        job_queue.enqueue,
+        request.app, request.instruction, request.workspace, request.record_macro, request.deadline_seconds
+    )
+
+@router.get("/workers", response_model=List[WorkerInfo])
+async def list_workers():
+    return await asyncio.to_thread(job_queue.live_workers)
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found.")
+    return job
@@ -0,0 +1,41 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request
+from app.models.task_models import MacroReplayRequest, TaskResponse
+from app.services.macro_service import macro_service
+from app.services.task_service import task_service
+from app.utils.deadline import ClientDisconnected, cancel_on_disconnect
+from app.utils.responses import FastJSONResponse, parse_shaping, shaped_response
+
+router = APIRouter(prefix="/macros", tags=["Macros"])
+
+@router.get("")
+async def list_macros():
+    return {"macros": macro_service.list_macros()}
+
+@router.get("/{name}")
+async def get_macro(name: str):
+    macro = macro_service.load(name) if macro_service.is_valid_name(name) else None
+    if not macro:
+        raise HTTPException(status_code=404, detail=f"Macro '{name}' not found.")
+    return macro
+
+@router.post("/{name}/replay", response_model=TaskResponse, response_class=FastJSONResponse)
+async def replay_macro(
+    name: str, request: MacroReplayRequest, http_request: Request,
+    fields: Optional[str] = None, page_states: str = "none"
+):
+    """Replay a recorded macro; ``fields`` and ``page_states`` shape the body as on ``/tasks/run``."""
+    macro = macro_service.load(name) if macro_service.is_valid_name(name) else None
+    if not macro:
+        raise HTTPException(status_code=404, detail=f"Macro '{name}' not found.")
+    selected_fields = parse_shaping(fields, page_states)
+
+    try:
+        result = await cancel_on_disconnect(
+            http_request, task_service.replay_macro(
+                macro, request.params, request.deadline_seconds, include_page_states=page_states != "none"
+            )
+        )
+    except ClientDisconnected:
+        raise HTTPException(status_code=499, detail="Client disconnected; replay cancelled.")
+    return shaped_response(result, selected_fields, page_states)
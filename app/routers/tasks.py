@@ -1,13 +1,62 @@
-from fastapi import APIRouter, HTTPException
-from app.models.task_models import TaskRequest, TaskResponse
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request
+from app.models.task_models import TaskRequest, TaskResponse, BatchTaskRequest, BatchTaskResponse
+from app.services.macro_service import macro_service
 from app.services.task_service import task_service
+from app.utils.config import settings
+from app.utils.deadline import ClientDisconnected, cancel_on_disconnect
+from app.utils.responses import FastJSONResponse, parse_shaping, shaped_response
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
-@router.post("/run", response_model=TaskResponse)
-async def run_task(request: TaskRequest):
+@router.post("/run", response_model=TaskResponse, response_class=FastJSONResponse)
+async def run_task(
+    request: TaskRequest, http_request: Request, fields: Optional[str] = None, page_states: str = "none"
+):
+    """Run one instruction.
+
+    The body follows ``TaskResponse`` unless shaping is requested: ``fields`` keeps only the
+    listed step fields, and ``page_states=ref|delta`` adds a ``page_states`` table that steps
+    reference by ``page_state_id`` (see ``shaped_response``).
+    """
     if not request.app or not request.instruction:
         raise HTTPException(status_code=400, detail="Both 'app' and 'instruction' are required.")
+    if request.record_macro and not macro_service.is_valid_name(request.record_macro):
+        raise HTTPException(status_code=400, detail="Macro names may only contain letters, digits, '-' and '_'.")
+    selected_fields = parse_shaping(fields, page_states)
+
+    try:
+        result = await cancel_on_disconnect(http_request, task_service.process_task(
+            request.app, request.instruction, request.record_macro,
+            request.include_timings, request.deadline_seconds,
+            include_page_states=page_states != "none"
+        ))
+    except ClientDisconnected:
+        raise HTTPException(status_code=499, detail="Client disconnected; task cancelled.")
+    return shaped_response(result, selected_fields, page_states)
+
+@router.post("/batch", response_model=BatchTaskResponse, response_class=FastJSONResponse)
+async def run_batch(
+    request: BatchTaskRequest, http_request: Request, fields: Optional[str] = None, page_states: str = "none"
+):
+    """Run several instructions in one browser session; ``fields`` and ``page_states`` shape
+    every result the same way as on ``/tasks/run``."""
+    instructions = [i for i in request.instructions if i and i.strip()]
+    if not request.app or not instructions:
+        raise HTTPException(status_code=400, detail="Both 'app' and at least one instruction are required.")
+    if len(instructions) > settings.BATCH_MAX_INSTRUCTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can contain at most {settings.BATCH_MAX_INSTRUCTIONS} instructions."
+        )
+    selected_fields = parse_shaping(fields, page_states)
 
-    result = await task_service.process_task(request.app, request.instruction)
-    return result
\ No newline at end of file
+    try:
+        result = await cancel_on_disconnect(
+            http_request, task_service.process_batch(
+                request.app, instructions, request.deadline_seconds, include_page_states=page_states != "none"
+            )
+        )
+    except ClientDisconnected:
+        raise HTTPException(status_code=499, detail="Client disconnected; batch cancelled.")
+    return shaped_response(result, selected_fields, page_states)
\ No newline at end of file
@@ -0,0 +1,243 @@
+import atexit
+import bisect
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlparse
+from app.utils.config import settings
+from app.utils.deadline import budget_ms
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+# Upper bounds (ms) of the latency buckets; roughly 25% apart from 25 ms to 3 minutes.
+BUCKET_BOUNDS_MS = [round(25 * 1.25 ** i) for i in range(41)]
+# Halve every bucket once a key has this many samples, so old observations fade out.
+MAX_SAMPLES = 2000
+SAVE_EVERY = 50
+# Keys are per selector, so keep the table bounded; the least-used key goes first.
+MAX_KEYS = 5000
+
+PAGE_ID = re.compile(r"[0-9a-f]{32}$|[0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}$", re.IGNORECASE)
+NUMBER = re.compile(r"^\d+$")
+DIGITS = re.compile(r"\d+")
+WHITESPACE = re.compile(r"\s+")
+
+
+def url_pattern(url: str) -> str:
+    """Collapse a URL to host plus the shape of its path, e.g. ``www.notion.so/:workspace/:page``"""
+    parsed = urlparse(url or "")
+    if not parsed.netloc:
+        return "unknown"
+    segments = [s for s in parsed.path.split("/") if s]
+    shape = []
+    for i, segment in enumerate(segments[:3]):
+        if PAGE_ID.search(segment):
+            shape.append(":page")
+        elif NUMBER.match(segment):
+            shape.append(":n")
+        else:
+            shape.append(segment if i == 0 and segment in ("login", "signup", "onboarding") else ":workspace")
+    return "/".join([parsed.netloc] + shape)
+
+
+def strategy_key(strategy: str, selector: str) -> str:
+    """Key an element lookup by its selector, so one fast selector does not set the timeout
+    of every other selector of the same strategy type"""
+    normalized = WHITESPACE.sub(" ", DIGITS.sub("#", (selector or "").strip().lower()))
+    return f"{strategy}:{normalized[:120]}"
+
+
+class AdaptiveTimeouts:
+    """Learns per-operation timeouts from observed latencies.
+
+    Latencies are bucketed per ``(action, strategy, url pattern)``, where element lookups
+    use a ``strategy_key`` that includes the selector. Attempts that time out are recorded
+    too, as censored samples at the time they gave up: the real latency was at least that.
+    Once a key has enough samples, its timeout is a high percentile of the successful
+    latencies times a safety margin, clamped to a floor and ceiling, so a selector that
+    normally matches quickly fails fast when its element is missing, while a slow
+    workspace load still gets the time it historically needs. Timeouts only raise that
+    value, one margin at a time, when successes reach the end of the current window and
+    attempts keep giving up there, i.e. when the window is cutting off a slow tail.
+    """
+
+    def __init__(self, stats_path: str):
+        self.stats_path = stats_path
+        self._histograms: Dict[Tuple[str, str, str], List[int]] = {}
+        self._timeouts: Dict[Tuple[str, str, str], List[int]] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._unsaved = 0
+
+    def timeout_ms(self, action: str, strategy: str, url: str, default_ms: float) -> float:
+        """The timeout to use for one attempt, already capped by the task deadline"""
+        return budget_ms(self._learned_ms(action, strategy, url_pattern(url), default_ms))
+
+    @contextmanager
+    def track(self, action: str, strategy: str, url: str):
+        """Record the latency of the enclosed attempt, or a censored sample if it timed out"""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            # Playwright's TimeoutError is not a subclass of the builtin one, so match by name.
+            if type(e).__name__ == "TimeoutError":
+                self.observe(action, strategy, url, (time.perf_counter() - started) * 1000, timed_out=True)
+            raise
+        self.observe(action, strategy, url, (time.perf_counter() - started) * 1000)
+
+    def observe(self, action: str, strategy: str, url: str, elapsed_ms: float, timed_out: bool = False):
+        if not settings.ADAPTIVE_TIMEOUTS_ENABLED:
+            return
+        key = (action, strategy, url_pattern(url))
+        with self._lock:
+            self._load()
+            if key not in self._histograms and len(self._histograms) >= MAX_KEYS:
+                self._drop(min(self._histograms, key=self._samples))
+            counts = self._histograms.setdefault(key, self._empty())
+            timeouts = self._timeouts.setdefault(key, self._empty())
+            (timeouts if timed_out else counts)[bisect.bisect_left(BUCKET_BOUNDS_MS, elapsed_ms)] += 1
+            if sum(counts) + sum(timeouts) > MAX_SAMPLES:
+                self._histograms[key] = [c // 2 for c in counts]
+                self._timeouts[key] = [c // 2 for c in timeouts]
+            self._unsaved += 1
+            if self._unsaved >= SAVE_EVERY:
+                self._save()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._load()
+            rows = []
+            for key, counts in sorted(self._histograms.items()):
+                action, strategy, pattern = key
+                timeouts = self._timeouts.get(key) or self._empty()
+                rows.append({
+                    "action": action,
+                    "strategy": strategy,
+                    "url_pattern": pattern,
+                    "samples": sum(counts) + sum(timeouts),
+                    "timeouts": sum(timeouts),
+                    "p50_ms": self._percentile(self._combined(counts, timeouts), 0.5),
+                    "timeout_ms": self._derive(counts, timeouts),
+                })
+            return rows
+
+    def flush(self):
+        with self._lock:
+            if self._loaded and self._unsaved:
+                self._save()
+
+    def _learned_ms(self, action: str, strategy: str, pattern: str, default_ms: float) -> float:
+        if not settings.ADAPTIVE_TIMEOUTS_ENABLED:
+            return default_ms
+        with self._lock:
+            self._load()
+            key = (action, strategy, pattern)
+            counts = self._histograms.get(key)
+            if not counts:
+                return default_ms
+            timeouts = self._timeouts.get(key) or self._empty()
+            if sum(counts) + sum(timeouts) < settings.ADAPTIVE_TIMEOUT_MIN_SAMPLES:
+                return default_ms
+            return self._derive(counts, timeouts)
+
+    def _derive(self, counts: List[int], timeouts: List[int]) -> float:
+        margin = settings.ADAPTIVE_TIMEOUT_MARGIN
+        percentile = settings.ADAPTIVE_TIMEOUT_PERCENTILE
+        learned = self._percentile(counts, percentile) * margin if any(counts) else 0.0
+        learned = self._clamp(learned)
+        # Attempts that gave up at about the current window, and successes that only just
+        # made it inside it. Misses of an absent element leave no successes near the end
+        # of the window, however often they happen, so they never hold the timeout up.
+        near = range(bisect.bisect_right(BUCKET_BOUNDS_MS, learned / margin),
+                      bisect.bisect_left(BUCKET_BOUNDS_MS, learned * 1.25) + 1)
+        late_successes = sum(counts[i] for i in near)
+        cut_off = sum(timeouts[i] for i in near)
+        if late_successes and cut_off > (1 - percentile) * (sum(counts) + cut_off):
+            learned = self._clamp(learned * margin)
+        return learned
+
+    def _clamp(self, timeout: float) -> float:
+        return min(max(timeout, settings.ADAPTIVE_TIMEOUT_FLOOR_MS), settings.ADAPTIVE_TIMEOUT_CEILING_MS)
+
+    def _samples(self, key: Tuple[str, str, str]) -> int:
+        return sum(self._histograms.get(key) or ()) + sum(self._timeouts.get(key) or ())
+
+    def _drop(self, key: Tuple[str, str, str]):
+        self._histograms.pop(key, None)
+        self._timeouts.pop(key, None)
+
+    def _empty(self) -> List[int]:
+        return [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def _combined(self, counts: List[int], timeouts: List[int]) -> List[int]:
+        return [a + b for a, b in zip(counts, timeouts)]
+
+    def _percentile(self, counts: List[int], q: float) -> float:
+        """Upper bound of the bucket holding the q-th sample; the overflow bucket maps to the ceiling"""
+        target = q * sum(counts)
+        seen = 0
+        for i, count in enumerate(counts):
+            seen += count
+            if seen >= target and count:
+                return BUCKET_BOUNDS_MS[i] if i < len(BUCKET_BOUNDS_MS) else settings.ADAPTIVE_TIMEOUT_CEILING_MS
+        return settings.ADAPTIVE_TIMEOUT_CEILING_MS
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.stats_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("bounds") != BUCKET_BOUNDS_MS:
+            logger.info("Ignoring timeout stats recorded with different buckets")
+            return
+        for entry in data.get("histograms", []):
+            key = (entry["action"], entry["strategy"], entry["url_pattern"])
+            self._histograms[key] = entry["counts"]
+            self._timeouts[key] = entry.get("timeouts") or self._empty()
+        logger.info("Loaded latency stats for %s operations", len(self._histograms))
+
+    def _save(self):
+        """Write the stats file; the API server and workers may share it, so failures are only logged"""
+        self._unsaved = 0
+        data = {
+            "bounds": BUCKET_BOUNDS_MS,
+            "histograms": [
+                {
+                    "action": a,
+                    "strategy": s,
+                    "url_pattern": p,
+                    "counts": counts,
+                    "timeouts": self._timeouts.get((a, s, p)) or self._empty(),
+                }
+                for (a, s, p), counts in self._histograms.items()
+            ],
+        }
+        # Each process and thread writes its own temporary file before swapping it in.
+        tmp_path = f"{self.stats_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            directory = os.path.dirname(self.stats_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.stats_path)
+        except OSError as e:
+            logger.warning("Could not save timeout stats to %s: %s", self.stats_path, e)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+adaptive_timeouts = AdaptiveTimeouts(settings.ADAPTIVE_TIMEOUT_STATS_PATH)
+atexit.register(adaptive_timeouts.flush)
@@ -0,0 +1,223 @@
+import atexit
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+from app.utils.config import settings
+from app.utils.log import get_logger
+from app.utils.metrics import registry
+
+logger = get_logger(__name__)
+
+ASSET_CACHE = registry.counter("softlight_asset_cache_total", "Static asset cache lookups and evictions, by outcome.")
+
+CACHEABLE_TYPES = frozenset({"script", "stylesheet", "font", "image"})
+# Build tools put a content hash in the file name of assets that never change.
+IMMUTABLE_URL = re.compile(r"(/_assets/|[.\-_][0-9a-f]{8,}\.(?:js|mjs|css|woff2?|ttf|svg|png|webp)(?:\?|$))")
+# Only the headers the page needs to use the body; transfer encodings no longer apply.
+KEPT_HEADERS = ("content-type", "access-control-allow-origin", "timing-allow-origin")
+# Hits only move an entry up the LRU order, so they are written in batches.
+TOUCH_BATCH_SIZE = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    refs INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    url TEXT PRIMARY KEY,
+    digest TEXT NOT NULL REFERENCES blobs (digest),
+    headers TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+"""
+
+
+class AssetCache:
+    """Disk-backed, content-addressed LRU cache for immutable static assets.
+
+    Bodies live under ``blobs/<sha256>`` so identical bundles served from several
+    URLs are stored once. ``index.sqlite3`` maps URLs to digests, counts blob
+    references and keeps the LRU order, so several processes (API servers and
+    workers) can share one ``ASSET_CACHE_DIR``: stores and evictions run in a
+    write transaction, and a blob is only deleted once no URL references it.
+    Hit, miss and eviction counts are per process.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._blob_dir = os.path.join(cache_dir, "blobs")
+        self._index_path = os.path.join(cache_dir, "index.sqlite3")
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._initialized = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def is_cacheable(self, url: str, resource_type: str) -> bool:
+        return resource_type in CACHEABLE_TYPES and bool(IMMUTABLE_URL.search(url))
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as db:
+            entry = db.execute("SELECT digest, headers FROM entries WHERE url = ?", (url,)).fetchone()
+        body = None
+        if entry is not None:
+            try:
+                with open(self._blob_path(entry["digest"]), "rb") as f:
+                    body = f.read()
+            except OSError:
+                # Evicted by another process between the lookup and the read.
+                with self._connect() as db:
+                    db.execute("BEGIN IMMEDIATE")
+                    self._remove(db, url)
+
+        with self._lock:
+            if body is None:
+                self.misses += 1
+                ASSET_CACHE.inc(outcome="miss")
+                return None
+            self.hits += 1
+            self._touched[url] = time.time()
+            flush_touches = len(self._touched) >= TOUCH_BATCH_SIZE
+        ASSET_CACHE.inc(outcome="hit")
+        if flush_touches:
+            self.flush()
+        return {"body": body, "headers": json.loads(entry["headers"])}
+
+    def put(self, url: str, body: bytes, headers: Dict[str, str]):
+        if len(body) > self.max_bytes:
+            return
+        digest = hashlib.sha256(body).hexdigest()
+        kept = {k: v for k, v in headers.items() if k.lower() in KEPT_HEADERS}
+
+        os.makedirs(self._blob_dir, exist_ok=True)
+        tmp_path = f"{self._blob_path(digest)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+
+        evicted = 0
+        try:
+            with self._connect() as db:
+                db.execute("BEGIN IMMEDIATE")
+                self._write_touches(db)
+                self._remove(db, url)
+                # Publishing the blob inside the transaction keeps a concurrent
+                # eviction from deleting it before the entry below references it.
+                os.replace(tmp_path, self._blob_path(digest))
+                db.execute(
+                    "INSERT INTO blobs (digest, size, refs) VALUES (?, ?, 1)"
+                    " ON CONFLICT(digest) DO UPDATE SET refs = refs + 1",
+                    (digest, len(body))
+                )
+                db.execute(
+                    "INSERT INTO entries (url, digest, headers, last_used) VALUES (?, ?, ?, ?)",
+                    (url, digest, json.dumps(kept), time.time())
+                )
+                evicted = self._evict(db)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        ASSET_CACHE.inc(outcome="store")
+        if evicted:
+            ASSET_CACHE.inc(evicted, outcome="evict")
+            with self._lock:
+                self.evictions += evicted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as db:
+            entries = db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            total_bytes = db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def flush(self):
+        """Persist the LRU order of entries hit since the last write"""
+        with self._lock:
+            if not self._touched:
+                return
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            self._write_touches(db)
+
+    def _write_touches(self, db):
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        db.executemany(
+            "UPDATE entries SET last_used = MAX(last_used, ?) WHERE url = ?",
+            [(used, url) for url, used in touched.items()]
+        )
+
+    def _evict(self, db) -> int:
+        total_bytes = db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        evicted = 0
+        while total_bytes > self.max_bytes:
+            oldest = db.execute("SELECT url FROM entries ORDER BY last_used, rowid LIMIT 1").fetchone()
+            if oldest is None:
+                break
+            total_bytes -= self._remove(db, oldest["url"])
+            evicted += 1
+        return evicted
+
+    def _remove(self, db, url: str) -> int:
+        """Drop an entry and, with its last reference, its blob; returns the bytes freed"""
+        entry = db.execute("SELECT digest FROM entries WHERE url = ?", (url,)).fetchone()
+        if entry is None:
+            return 0
+        digest = entry["digest"]
+        db.execute("DELETE FROM entries WHERE url = ?", (url,))
+        db.execute("UPDATE blobs SET refs = refs - 1 WHERE digest = ?", (digest,))
+        blob = db.execute("SELECT size, refs FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if blob is None or blob["refs"] > 0:
+            return 0
+        db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+        try:
+            os.remove(self._blob_path(digest))
+        except OSError:
+            pass
+        return blob["size"]
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self._blob_dir, digest)
+
+    @contextmanager
+    def _connect(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        db = sqlite3.connect(self._index_path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            if not self._initialized:
+                db.execute("PRAGMA journal_mode=WAL")
+                db.executescript(SCHEMA)
+                self._initialized = True
+            yield db
+            if db.in_transaction:
+                db.execute("COMMIT")
+        except Exception:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+
+asset_cache = AssetCache(settings.ASSET_CACHE_DIR, settings.ASSET_CACHE_MAX_MB * 1024 * 1024)
+atexit.register(asset_cache.flush)
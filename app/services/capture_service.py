@@ -1,228 +1,698 @@
 import os
+import re
 import asyncio
+import time
 from typing import List, Dict, Any
 from datetime import datetime
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from app.utils.config import settings
+from app.utils.deadline import DeadlineExceeded, budget_ms, budget_seconds, check_deadline
+from app.utils.log import get_logger
+from app.utils.metrics import span, strategy_span, SPECULATIVE_PLANS
+from app.services.adaptive_timeouts import adaptive_timeouts, strategy_key
+from app.services.input_engine import input_engine
 from app.services.page_analyzer import page_analyzer
+from app.services.resource_router import resource_router
+from app.services.screencast import capture_still, mark, start_recording, stop_recording
 from app.services.llm_agent import llm_agent
 
+logger = get_logger(__name__)
+
+# Written into a workspace profile once a run has reached the logged-in workspace.
+LOGIN_MARKER = ".logged_in"
+
 class CaptureService:
-    async def execute_steps(self, app: str, instruction: str) -> List[Dict[str, Any]]:
-        base_dir = f"app/dataset/notion_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        os.makedirs(base_dir, exist_ok=True)
-        captured_steps = []
+    async def execute_steps(
+        self, app: str, instruction: str, workspace: str = None, captured_steps: List[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Plan and run an instruction; steps are appended to ``captured_steps`` as they finish,
+        so a caller that cancels the run still has everything captured up to that point."""
+        # Playwright is imported on first use so that importing the service stays cheap.
+        from playwright.async_api import async_playwright
+
+        base_dir = self._new_run_dir("notion")
+        if captured_steps is None:
+            captured_steps = []
+
+        # Planning from the instruction alone does not need the browser, so the
+        # LLM round trip runs while the browser launches and navigates.
+        plan_task = asyncio.create_task(self._plan_speculatively(instruction))
 
         async with async_playwright() as p:
             browser = None
             context = None
             page = None
+            recorder = None
             
             try:
-                profile_path = "./playwright_profile"
-                print(f"Using dedicated Playwright profile: {profile_path}")
-                
-                context = await p.chromium.launch_persistent_context(
-                    user_data_dir=profile_path,
-                    headless=False,
-                    viewport={"width": 1280, "height": 720}
-                )
-                page = await context.new_page()
-                
-                page.set_default_navigation_timeout(45000)
-                page.set_default_timeout(30000)
+                context, page = await self._open_session(p, workspace)
+                recorder = await start_recording(page, base_dir)
 
-                initial_url = "https://www.notion.so/"
-                try:
-                    print(f"Navigating to {initial_url}...")
-                    await page.goto(initial_url, wait_until="domcontentloaded", timeout=45000)
-                    await asyncio.sleep(2)
-                    print(f"Loaded: {page.url}")
-                except PlaywrightTimeoutError:
-                    print(f"Timeout navigating to {initial_url}, continuing")
-                except Exception as e:
-                    print(f"Navigation error: {e}")
+                page_context, error_steps = await self._prepare_session(page, base_dir, workspace=workspace)
+                if error_steps:
+                    captured_steps.extend(error_steps)
+                    return captured_steps
+
+                steps_raw = await self._finalize_plan(instruction, await plan_task, page_context)
+                await self._run_steps(page, steps_raw, base_dir, page_context, instruction, captured_steps)
 
-                page_context = {}
+            except Exception as e:
+                logger.error("Notion browser setup error: %s", e)
+                captured_steps.append({
+                    "action": "error",
+                    "selector_hint": "browser_setup",
+                    "description": f"Notion browser failed: {e}",
+                    "screenshot_path": None,
+                    "error": str(e)
+                })
+            finally:
+                if not plan_task.done():
+                    plan_task.cancel()
+                await stop_recording(recorder)
                 try:
-                    page_context = await page_analyzer.analyze_page(page)
-                    print(f"Notion page analysis: Found {len(page_context.get('interactive_elements', []))} interactive elements")
+                    if page:
+                        await page.close()
+                    if context:
+                        await context.close()
+                    if browser:
+                        await browser.close()
+                    logger.info("Notion browser closed")
                 except Exception as e:
-                    print(f"Page analysis failed: {e}")
-                    page_context = {
-                        "url": page.url if page else "unknown",
-                        "title": await page.title() if page else "unknown"
-                    }
-
-                page_state = await self._detect_notion_page_state(page)
-                print(f"Notion page state: {page_state}")
-
-                if page_state == "login_required":
-                    print("Notion login required. Please log in manually...")
-                    print("Waiting for workspace detection (3 minutes max)...")
-                    
+                    logger.error("Error closing Notion browser: %s", e)
+
+        return captured_steps
+
+    async def execute_batch(
+        self,
+        app: str,
+        instructions: List[str],
+        plans: List[List[Dict[str, Any]]],
+        results: List[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Run pre-planned instructions one after another inside a single browser session.
+
+        Each instruction's outcome is appended to ``results`` when it starts, with
+        ``duration_ms`` left as None until it finishes, and its steps fill in as they run.
+        """
+        from playwright.async_api import async_playwright
+
+        batch_dir = self._new_run_dir("notion_batch")
+        if results is None:
+            results = []
+
+        async with async_playwright() as p:
+            context = None
+            page = None
+            recorder = None
+
+            try:
+                started = time.perf_counter()
+                context, page = await self._open_session(p)
+                recorder = await start_recording(page, batch_dir)
+
+                page_context, error_steps = await self._prepare_session(page, batch_dir)
+                if error_steps:
+                    results.extend(
+                        {"steps": list(error_steps), "duration_ms": (time.perf_counter() - started) * 1000}
+                        for _ in instructions
+                    )
+                    return results
+
+                for index, (instruction, plan) in enumerate(zip(instructions, plans), start=1):
+                    started = time.perf_counter()
+                    base_dir = os.path.join(batch_dir, f"task_{index}")
+                    os.makedirs(base_dir, exist_ok=True)
+                    logger.info("Batch task %s/%s: %s", index, len(instructions), instruction)
+                    mark("task_start", task=index)
+                    outcome = {"steps": [], "duration_ms": None, "started": started}
+                    results.append(outcome)
+
                     try:
-                        await page.wait_for_function(
-                            """() => {
-                                return document.querySelector('.notion-sidebar') || 
-                                    document.querySelector('[data-block-id]') ||
-                                    document.querySelector('[data-testid*=\"create\"]') ||
-                                    document.querySelector('.notion-frame') ||
-                                    document.querySelector('[aria-label*=\"New\"]') ||
-                                    document.body.innerText.includes('New page') ||
-                                    document.body.innerText.includes('Search') ||
-                                    document.body.innerText.includes('Workspace');
-                            }""",
-                            timeout=180000
-                        )
-                        
-                        print("Notion workspace detected. Login successful. Proceeding...")
-                        
+                        if index > 1:
+                            # Every instruction starts from the workspace home, like a fresh run would.
+                            page_context = await self._return_home(page)
+                        steps_raw = await self._finalize_plan(instruction, plan, page_context)
+                        await self._run_steps(page, steps_raw, base_dir, page_context, instruction, outcome["steps"])
                     except Exception as e:
-                        print(f"Notion authentication timeout: {e}")
-                        screenshot_path = os.path.join(base_dir, "login_timeout.png")
-                        await page.screenshot(path=screenshot_path)
-                        page_text = await page.evaluate("() => document.body.innerText")
-                        print(f"Current page content: {page_text[:200]}...")
-                        
-                        return [{
+                        logger.error("Batch task %s error: %s", index, e)
+                        outcome["steps"].append({
                             "action": "error",
-                            "selector_hint": "authentication",
-                            "description": "Notion login timeout",
-                            "value": None,
-                            "url": page.url,
-                            "screenshot_path": screenshot_path,
-                            "error": f"Could not detect Notion workspace. Content: {page_text[:100]}..."
-                        }]
+                            "selector_hint": "batch",
+                            "description": f"Batch task failed: {e}",
+                            "screenshot_path": None,
+                            "error": str(e)
+                        })
 
-                elif page_state == "authenticated":
-                    print("Notion authenticated. Proceeding with task...")
-                else:
-                    print("Unknown Notion page state. Proceeding cautiously...")
-                    page_content = await page.content()
-                    if len(page_content) > 3000:
-                        print("Page has content, proceeding...")
-                    else:
-                        print("Page seems empty, cannot proceed.")
-                        return [{
-                            "action": "error",
-                            "selector_hint": "page_analysis", 
-                            "description": "Notion page state unclear",
-                            "value": None,
-                            "url": page.url,
-                            "error": "Could not determine Notion page state"
-                        }]
+                    outcome["duration_ms"] = (time.perf_counter() - started) * 1000
 
-                steps_raw = []
+            except Exception as e:
+                logger.error("Notion batch browser setup error: %s", e)
+                error_step = {
+                    "action": "error",
+                    "selector_hint": "browser_setup",
+                    "description": f"Notion browser failed: {e}",
+                    "screenshot_path": None,
+                    "error": str(e)
+                }
+                results.extend(
+                    {"steps": [error_step], "duration_ms": 0.0} for _ in instructions[len(results):]
+                )
+            finally:
+                await stop_recording(recorder)
                 try:
-                    steps_raw = await llm_agent.analyze_page_and_generate_steps(
-                        "Notion", instruction, page_context
-                    )
-                    print(f"Generated {len(steps_raw)} steps for Notion")
+                    if page:
+                        await page.close()
+                    if context:
+                        await context.close()
+                    logger.info("Notion batch browser closed")
                 except Exception as e:
-                    print(f"Notion step generation failed: {e}")
-                    steps_raw = [
-                        {
-                            "action": "click",
-                            "selector_hint": "New",
-                            "description": "Find new/create button",
-                            "value": None,
-                            "url": None
-                        },
-                        {
-                            "action": "fill", 
-                            "selector_hint": "Untitled",
-                            "description": "Enter title",
-                            "value": "Notion Page",
-                            "url": None
-                        }
-                    ]
-
-                for i, step in enumerate(steps_raw, start=1):
-                    try:
-                        print(f"Executing Notion step {i}/{len(steps_raw)}: {step.get('action')} '{step.get('selector_hint')}'")
-                        
-                        before_screenshot = await page.screenshot()
-
-                        step_success = await self._execute_single_step(page, step, i, "Notion")
-                        
-                        if not step_success:
-                            print(f"Step {i} failed, stopping execution")
-                            error_screenshot = os.path.join(base_dir, f"error_step_{i}.png")
-                            await page.screenshot(path=error_screenshot)
-                            captured_steps.append({
-                                **step, 
-                                "screenshot_path": error_screenshot, 
-                                "error": "Step execution failed",
-                                "url": page.url if page else "unknown",
-                                "verified": False
-                            })
-                            break
-                        
-                        action_verified = await self._verify_action(page, step, before_screenshot)
-                        if not action_verified:
-                            print(f"Action verification uncertain for step {i}")
-                        
-                        screenshot_path = os.path.join(base_dir, f"step_{i}.png")
-                        await page.screenshot(path=screenshot_path)
-                        
-                        try:
-                            page_context = await page_analyzer.analyze_page(page)
-                        except Exception as e:
-                            print(f"Page analysis update failed: {e}")
-                        
+                    logger.error("Error closing Notion browser: %s", e)
+
+        return results
+
+    async def replay_macro(
+        self, steps: List[Dict[str, Any]], captured_steps: List[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Run recorded steps through their resolved selectors, without planning or page analysis"""
+        from playwright.async_api import async_playwright
+
+        base_dir = self._new_run_dir("notion_replay")
+        if captured_steps is None:
+            captured_steps = []
+
+        async with async_playwright() as p:
+            context = None
+            page = None
+            recorder = None
+
+            try:
+                context, page = await self._open_session(p)
+                recorder = await start_recording(page, base_dir)
+
+                _, error_steps = await self._prepare_session(page, base_dir, analyze=False)
+                if error_steps:
+                    captured_steps.extend(error_steps)
+                    return captured_steps
+
+                for i, step in enumerate(steps, start=1):
+                    logger.info("Replaying Notion step %s/%s: %s '%s'", i, len(steps), step.get('action'), step.get('selector_hint'))
+                    mark("step_start", step=i)
+                    with span("step_execution"):
+                        replayed = await self._replay_step(page, step)
+
+                    step_success = replayed
+                    resolution = dict(step.get("resolved") or {})
+                    if step.get("input_mode"):
+                        resolution["input_mode"] = step["input_mode"]
+                    if not replayed:
+                        logger.warning("Recorded selector failed for step %s, falling back to full resolution", i)
+                        resolution = {}
+                        step_success = await self._execute_single_step(page, step, i, "Notion", resolution)
+
+                    mark("step_end", step=i, ok=step_success)
+                    if not step_success:
+                        error_screenshot = await capture_still(page, base_dir, f"error_step_{i}")
                         captured_steps.append({
-                            **step, 
-                            "screenshot_path": screenshot_path, 
+                            **step,
+                            "screenshot_path": error_screenshot,
+                            "error": "Step execution failed",
                             "url": page.url,
-                            "page_state": page_context,
-                            "verified": action_verified
-                        })
-                        
-                        await asyncio.sleep(1)
-                        
-                    except Exception as e:
-                        print(f"Error in Notion step {i}: {e}")
-                        error_screenshot = os.path.join(base_dir, f"error_step_{i}.png")
-                        try:
-                            await page.screenshot(path=error_screenshot)
-                        except:
-                            error_screenshot = None
-                        
-                        captured_steps.append({
-                            **step, 
-                            "screenshot_path": error_screenshot, 
-                            "error": str(e),
-                            "url": page.url if page else "unknown",
-                            "verified": False
+                            "verified": False,
+                            "replayed": False
                         })
                         break
 
+                    with span("verification"):
+                        action_verified = await self._verify_action(page, step)
+                    if not action_verified:
+                        logger.warning("Action verification uncertain for replayed step %s", i)
+
+                    with span("screenshot"):
+                        screenshot_path = await capture_still(page, base_dir, f"step_{i}")
+                    captured_steps.append({
+                        **step,
+                        "screenshot_path": screenshot_path,
+                        "url": page.url,
+                        "verified": action_verified,
+                        "resolved": resolution or None,
+                        "input_mode": resolution.get("input_mode"),
+                        "replayed": replayed
+                    })
+
             except Exception as e:
-                print(f"Notion browser setup error: {e}")
+                logger.error("Notion replay error: %s", e)
                 captured_steps.append({
                     "action": "error",
-                    "selector_hint": "browser_setup",
-                    "description": f"Notion browser failed: {e}",
+                    "selector_hint": "replay",
+                    "description": f"Notion replay failed: {e}",
                     "screenshot_path": None,
                     "error": str(e)
                 })
             finally:
+                await stop_recording(recorder)
                 try:
                     if page:
                         await page.close()
                     if context:
                         await context.close()
-                    if browser:
-                        await browser.close()
-                    print("Notion browser closed")
+                    logger.info("Notion browser closed")
                 except Exception as e:
-                    print(f"Error closing Notion browser: {e}")
+                    logger.error("Error closing Notion browser: %s", e)
+
+        return captured_steps
+
+    async def _replay_step(self, page, step: Dict[str, Any]) -> bool:
+        """Execute a step directly through its recorded selector; False means it needs re-resolution"""
+        action = step.get("action")
+        resolved = step.get("resolved") or {}
+
+        if action not in ("click", "fill"):
+            return await self._execute_single_step(page, step, 0, "Notion")
+        if not resolved.get("value"):
+            return False
+
+        selector = {
+            "text": f"text={resolved['value']}",
+            "xpath": f"xpath={resolved['value']}",
+        }.get(resolved.get("type"), resolved["value"])
+
+        try:
+            key = strategy_key("recorded", selector)
+            timeout = adaptive_timeouts.timeout_ms(action, key, page.url, 5000)
+            with adaptive_timeouts.track(action, key, page.url):
+                if action == "click":
+                    await page.click(selector, timeout=timeout)
+                else:
+                    mode = await input_engine.fill_selector(page, selector, step.get("value") or "", timeout=timeout)
+                    step["input_mode"] = mode
+        except Exception as e:
+            logger.debug("Replay of recorded selector failed: %s", e)
+            return False
+
+        if resolved.get("wait_after"):
+            await asyncio.sleep(resolved["wait_after"])
+        return True
+
+    def _new_run_dir(self, prefix: str) -> str:
+        # Microseconds keep concurrent runs from writing into the same directory.
+        run_dir = os.path.join(settings.DATASET_DIR, f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+        os.makedirs(run_dir, exist_ok=True)
+        return run_dir
+
+    def profile_path(self, workspace: str = None) -> str:
+        """Each workspace gets its own persistent profile, so its login survives between runs"""
+        if workspace:
+            return os.path.join(settings.WORKSPACE_PROFILES_DIR, workspace)
+        return settings.PLAYWRIGHT_USER_DATA_DIR or "./playwright_profile"
+
+    def is_logged_in(self, workspace: str) -> bool:
+        """Whether a run has reached the logged-in workspace with this workspace's profile"""
+        return os.path.isfile(os.path.join(self.profile_path(workspace), LOGIN_MARKER))
+
+    def _set_logged_in(self, workspace: str, logged_in: bool):
+        marker = os.path.join(self.profile_path(workspace), LOGIN_MARKER)
+        try:
+            if logged_in:
+                with open(marker, "w", encoding="utf-8") as f:
+                    f.write(datetime.now().isoformat())
+            elif os.path.exists(marker):
+                os.remove(marker)
+        except OSError as e:
+            logger.warning("Could not update login marker %s: %s", marker, e)
+
+    async def _open_session(self, p, workspace: str = None):
+        profile_path = self.profile_path(workspace)
+        logger.info("Using dedicated Playwright profile: %s", profile_path)
+
+        with span("browser_launch"):
+            context = await p.chromium.launch_persistent_context(
+                user_data_dir=profile_path,
+                headless=settings.PLAYWRIGHT_HEADLESS,
+                viewport={
+                    "width": settings.PLAYWRIGHT_VIEWPORT_WIDTH,
+                    "height": settings.PLAYWRIGHT_VIEWPORT_HEIGHT
+                },
+                device_scale_factor=settings.PLAYWRIGHT_DEVICE_SCALE_FACTOR
+            )
+            await resource_router.install(context, "Notion")
+            page = await context.new_page()
+
+        page.set_default_navigation_timeout(budget_ms(45000))
+        page.set_default_timeout(budget_ms(30000))
+        return context, page
+
+    async def _prepare_session(self, page, base_dir: str, analyze: bool = True, workspace: str = None):
+        """Navigate to Notion and wait for a usable workspace.
+
+        Returns the analysed page context and, when the session cannot be used,
+        the error steps to report instead. For a ``workspace`` profile, whether
+        the login worked is recorded for ``is_logged_in``.
+        """
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+        initial_url = settings.NOTION_URL
+        try:
+            logger.info("Navigating to %s...", initial_url)
+            with span("navigation"):
+                timeout = adaptive_timeouts.timeout_ms("navigate", "goto", initial_url, 45000)
+                with adaptive_timeouts.track("navigate", "goto", initial_url):
+                    await page.goto(initial_url, wait_until="domcontentloaded", timeout=timeout)
+                await asyncio.sleep(2)
+            logger.info("Loaded: %s", page.url)
+        except PlaywrightTimeoutError:
+            logger.warning("Timeout navigating to %s, continuing", initial_url)
+        except Exception as e:
+            logger.error("Navigation error: %s", e)
+
+        page_context = {"url": page.url}
+        try:
+            if analyze:
+                with span("page_analysis"):
+                    page_context = await page_analyzer.analyze_page(page)
+            logger.info("Notion page analysis: Found %s interactive elements", len(page_context.get('interactive_elements', [])))
+        except Exception as e:
+            logger.warning("Page analysis failed: %s", e)
+            page_context = {
+                "url": page.url if page else "unknown",
+                "title": await page.title() if page else "unknown"
+            }
+
+        with span("state_detection"):
+            page_state = await self._detect_notion_page_state(page)
+        logger.info("Notion page state: %s", page_state)
+
+        if page_state == "login_required":
+            logger.warning("Notion login required. Please log in manually...")
+            logger.info("Waiting for workspace detection (3 minutes max)...")
+            
+            try:
+                with span("login_wait"):
+                    await page.wait_for_function(
+                        """() => {
+                            return document.querySelector('.notion-sidebar') || 
+                                document.querySelector('[data-block-id]') ||
+                                document.querySelector('[data-testid*=\"create\"]') ||
+                                document.querySelector('.notion-frame') ||
+                                document.querySelector('[aria-label*=\"New\"]') ||
+                                document.body.innerText.includes('New page') ||
+                                document.body.innerText.includes('Search') ||
+                                document.body.innerText.includes('Workspace');
+                        }""",
+                        timeout=budget_ms(180000)
+                    )
+                
+                logger.info("Notion workspace detected. Login successful. Proceeding...")
+                if workspace:
+                    self._set_logged_in(workspace, True)
+                
+            except Exception as e:
+                logger.warning("Notion authentication timeout: %s", e)
+                if workspace:
+                    self._set_logged_in(workspace, False)
+                screenshot_path = await capture_still(page, base_dir, "login_timeout")
+                page_text = await page.evaluate("() => document.body.innerText")
+                logger.warning("Current page content: %s...", page_text[:200])
+                
+                return page_context, [{
+                    "action": "error",
+                    "selector_hint": "authentication",
+                    "description": "Notion login timeout",
+                    "value": None,
+                    "url": page.url,
+                    "screenshot_path": screenshot_path,
+                    "error": f"Could not detect Notion workspace. Content: {page_text[:100]}..."
+                }]
+
+        elif page_state == "authenticated":
+            logger.info("Notion authenticated. Proceeding with task...")
+            if workspace:
+                self._set_logged_in(workspace, True)
+        else:
+            logger.warning("Unknown Notion page state. Proceeding cautiously...")
+            page_content = await page.content()
+            if len(page_content) > 3000:
+                logger.info("Page has content, proceeding...")
+            else:
+                logger.warning("Page seems empty, cannot proceed.")
+                return page_context, [{
+                    "action": "error",
+                    "selector_hint": "page_analysis", 
+                    "description": "Notion page state unclear",
+                    "value": None,
+                    "url": page.url,
+                    "error": "Could not determine Notion page state"
+                }]
+
+        return page_context, None
+
+    async def _return_home(self, page) -> Dict[str, Any]:
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+        try:
+            with span("navigation"):
+                timeout = adaptive_timeouts.timeout_ms("navigate", "goto", settings.NOTION_URL, 45000)
+                with adaptive_timeouts.track("navigate", "goto", settings.NOTION_URL):
+                    await page.goto(settings.NOTION_URL, wait_until="domcontentloaded", timeout=timeout)
+                await asyncio.sleep(1)
+        except PlaywrightTimeoutError:
+            logger.warning("Timeout navigating to %s, continuing", settings.NOTION_URL)
+
+        try:
+            with span("page_analysis"):
+                return await page_analyzer.analyze_page(page)
+        except Exception as e:
+            logger.warning("Page analysis failed: %s", e)
+            return {"url": page.url}
+
+    async def _finalize_plan(
+        self, instruction: str, steps_raw: List[Dict[str, Any]], page_context: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Keep a context-free plan if it fits the page, otherwise re-plan with page context"""
+        if self._plan_fits_page(steps_raw, page_context):
+            SPECULATIVE_PLANS.inc(outcome="used")
+            logger.info("Using speculative plan with %s steps for Notion", len(steps_raw))
+        else:
+            SPECULATIVE_PLANS.inc(outcome="replanned")
+            logger.warning("Speculative plan does not fit the page, re-planning with page context")
+            try:
+                steps_raw = await llm_agent.analyze_page_and_generate_steps(
+                    "Notion", instruction, page_context
+                )
+                logger.info("Generated %s steps for Notion", len(steps_raw))
+            except Exception as e:
+                logger.warning("Notion step generation failed: %s", e)
+                steps_raw = []
+
+        if not steps_raw:
+            steps_raw = [
+                {
+                    "action": "click",
+                    "selector_hint": "New",
+                    "description": "Find new/create button",
+                    "value": None,
+                    "url": None
+                },
+                {
+                    "action": "fill", 
+                    "selector_hint": "Untitled",
+                    "description": "Enter title",
+                    "value": "Notion Page",
+                    "url": None
+                }
+            ]
+        return steps_raw
+
+    async def _run_steps(
+        self,
+        page,
+        steps_raw: List[Dict[str, Any]],
+        base_dir: str,
+        page_context: Dict[str, Any],
+        instruction: str = None,
+        captured_steps: List[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Execute a plan, revising its remaining tail in place when a step fails.
+
+        Failed attempts that were recovered by a re-plan stay in the result,
+        marked ``recovered``, so the run can still be audited. Steps are appended
+        to ``captured_steps`` when given.
+        """
+        if captured_steps is None:
+            captured_steps = []
+        plan = list(steps_raw)
+        replans_left = settings.MAX_REPLANS if instruction else 0
+        i = 0
+
+        while i < len(plan):
+            step = plan[i]
+            step_num = len(captured_steps) + 1
+            error = None
+            try:
+                check_deadline()
+                logger.info("Executing Notion step %s (%s/%s): %s '%s'", step_num, i + 1, len(plan), step.get('action'), step.get('selector_hint'))
+                mark("step_start", step=step_num)
+
+                resolution = {}
+                with span("step_execution"):
+                    step_success = await self._execute_single_step(page, step, step_num, "Notion", resolution)
+                mark("step_end", step=step_num, ok=step_success)
+                
+                if not step_success:
+                    logger.warning("Step %s failed", step_num)
+                    error = "Step execution failed"
+                else:
+                    with span("verification"):
+                        action_verified = await self._verify_action(page, step)
+                    if not action_verified:
+                        logger.warning("Action verification uncertain for step %s", step_num)
+                    
+                    with span("screenshot"):
+                        screenshot_path = await capture_still(page, base_dir, f"step_{step_num}")
+                    
+                    try:
+                        with span("page_analysis"):
+                            page_context = await page_analyzer.analyze_page(page)
+                    except Exception as e:
+                        logger.warning("Page analysis update failed: %s", e)
+                    
+                    captured_steps.append({
+                        **step, 
+                        "screenshot_path": screenshot_path, 
+                        "url": page.url,
+                        "page_state": page_context,
+                        "verified": action_verified,
+                        "resolved": resolution or None,
+                        "input_mode": resolution.get("input_mode")
+                    })
+                    
+                    await asyncio.sleep(1)
+                    i += 1
+                    continue
+                
+            except Exception as e:
+                logger.error("Error in Notion step %s: %s", step_num, e)
+                error = str(e)
+                if isinstance(e, DeadlineExceeded):
+                    # Re-planning cannot help once the budget is gone.
+                    replans_left = 0
+
+            try:
+                error_screenshot = await capture_still(page, base_dir, f"error_step_{step_num}")
+            except:
+                error_screenshot = None
+
+            failed_step = {
+                **step,
+                "screenshot_path": error_screenshot,
+                "error": error,
+                "url": page.url if page else "unknown",
+                "verified": False
+            }
+            captured_steps.append(failed_step)
+
+            if replans_left <= 0:
+                logger.warning("Step %s failed, stopping execution", step_num)
+                break
+
+            replans_left -= 1
+            revised_tail, page_context = await self._replan_tail(
+                page, instruction, step, plan[i + 1:], page_context, error
+            )
+            if not revised_tail:
+                logger.warning("No revised plan for step %s, stopping execution", step_num)
+                break
+
+            failed_step["recovered"] = True
+            logger.info("Continuing with %s revised steps (%s re-plans left)", len(revised_tail), replans_left)
+            plan = plan[:i] + revised_tail
 
         return captured_steps
 
-    async def _execute_single_step(self, page, step: Dict[str, Any], step_num: int, app: str) -> bool:
-        """Execute a single step and return True if successful, False otherwise"""
+    async def _replan_tail(
+        self,
+        page,
+        instruction: str,
+        failed_step: Dict[str, Any],
+        remaining_steps: List[Dict[str, Any]],
+        page_context: Dict[str, Any],
+        error: str,
+    ):
+        """Ask the planner for a new tail given only the failure and what changed on the page"""
+        try:
+            with span("page_analysis"):
+                current_context = await page_analyzer.analyze_page(page)
+        except Exception as e:
+            logger.warning("Page analysis for re-plan failed: %s", e)
+            current_context = {"url": page.url}
+
+        page_delta = self._page_delta(page_context, current_context)
+        try:
+            revised_tail = await llm_agent.replan_steps(
+                "Notion", instruction, failed_step, remaining_steps, page_delta, error
+            )
+        except Exception as e:
+            logger.warning("Re-planning failed: %s", e)
+            revised_tail = []
+        return revised_tail, current_context
+
+    def _page_delta(self, before: Dict[str, Any], after: Dict[str, Any], limit: int = 20) -> Dict[str, Any]:
+        def labels(context):
+            return {
+                e.get("text") or e.get("aria_label")
+                for e in (context or {}).get("interactive_elements", [])
+                if e.get("text") or e.get("aria_label")
+            }
+
+        before_labels = labels(before)
+        after_labels = labels(after)
+        return {
+            "url": after.get("url"),
+            "url_changed": (before or {}).get("url") != after.get("url"),
+            "appeared": sorted(after_labels - before_labels)[:limit],
+            "disappeared": sorted(before_labels - after_labels)[:limit],
+            "visible": sorted(after_labels)[:limit],
+        }
+
+    async def _plan_speculatively(self, instruction: str) -> List[Dict[str, Any]]:
+        """Generate steps from the instruction alone, before any page context exists"""
+        try:
+            return await llm_agent.analyze_page_and_generate_steps("Notion", instruction)
+        except Exception as e:
+            logger.warning("Speculative planning failed: %s", e)
+            return []
+
+    def _plan_fits_page(self, steps: List[Dict[str, Any]], page_context: Dict[str, Any]) -> bool:
+        """Check whether a plan made without page context still targets what the page shows"""
+        if not steps:
+            return False
+
+        elements = page_context.get("interactive_elements") or []
+        if not elements:
+            # Without analysed elements there is nothing that could contradict the plan.
+            return True
+
+        target = next((s for s in steps if s.get("action") in ("click", "fill")), None)
+        if not target or not target.get("selector_hint"):
+            return True
+
+        hint = re.sub(r"\(.*?\)", "", target["selector_hint"]).lower()
+        words = [w for w in re.findall(r"[a-z0-9&]+", hint) if len(w) > 2]
+        if not words:
+            return True
+
+        labels = " ".join(
+            f"{e.get('text', '')} {e.get('aria_label', '')} {e.get('data_testid', '')}" for e in elements
+        ).lower()
+        return any(word in labels for word in words)
+
+    async def _execute_single_step(
+        self, page, step: Dict[str, Any], step_num: int, app: str, resolution: Dict[str, Any] = None
+    ) -> bool:
+        """Execute a single step and return True if successful, False otherwise.
+
+        When ``resolution`` is given, it is filled with the strategy the step resolved to.
+        """
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
         action = step.get("action")
         selector_hint = step.get("selector_hint", "")
         value = step.get("value")
@@ -230,25 +700,27 @@ class CaptureService:
         try:
             if action == "navigate" and step.get("url"):
                 try:
-                    print(f"Navigating to {step['url']}...")
-                    await page.goto(step["url"], wait_until="domcontentloaded", timeout=30000)
+                    logger.debug("Navigating to %s...", step['url'])
+                    timeout = adaptive_timeouts.timeout_ms("navigate", "goto", step["url"], 30000)
+                    with adaptive_timeouts.track("navigate", "goto", step["url"]):
+                        await page.goto(step["url"], wait_until="domcontentloaded", timeout=timeout)
                     await asyncio.sleep(2)
                     return True
                 except PlaywrightTimeoutError:
-                    print(f"Navigation timeout to {step['url']}")
+                    logger.warning("Navigation timeout to %s", step['url'])
                     return False
                     
             elif action == "wait":
                 wait_time = int(value or 2)
-                print(f"Waiting for {wait_time} seconds...")
-                await asyncio.sleep(wait_time)
+                logger.debug("Waiting for %s seconds...", wait_time)
+                await asyncio.sleep(budget_seconds(wait_time))
                 return True
                 
             elif action == "click":
-                return await self._smart_click(page, selector_hint, "Notion")
+                return await self._smart_click(page, selector_hint, "Notion", resolution)
                 
             elif action == "fill":
-                return await self._smart_fill(page, selector_hint, value, "Notion")
+                return await self._smart_fill(page, selector_hint, value, "Notion", resolution)
                 
             elif action == "press":
                 return await self._smart_press(page, selector_hint, value)
@@ -256,74 +728,93 @@ class CaptureService:
             await asyncio.sleep(1)
             return True
             
+        except DeadlineExceeded:
+            raise
         except Exception as e:
-            print(f"Step execution error: {e}")
+            logger.error("Step execution error: %s", e)
             return False
 
-    async def _smart_click(self, page, selector_hint: str, app: str) -> bool:
+    async def _smart_click(self, page, selector_hint: str, app: str, resolution: Dict[str, Any] = None) -> bool:
         """Click an element and return True if successful"""
         if not selector_hint or selector_hint.strip() == "":
-            print("No selector hint for click")
+            logger.warning("No selector hint for click")
             return False
         if selector_hint.lower() in ["database", "page", "new database"]:
             try:
                 selector = f".notion-overlay-container [role='button']:has-text('{selector_hint}')"
-                await page.click(selector, timeout=5000)
-                print(f"Clicked dropdown option: '{selector_hint}'")
+                key = strategy_key("dropdown", selector)
+                with strategy_span("click", "dropdown"), adaptive_timeouts.track("click", key, page.url):
+                    await page.click(selector, timeout=adaptive_timeouts.timeout_ms("click", key, page.url, 5000))
+                logger.debug("Clicked dropdown option: '%s'", selector_hint)
+                self._record_resolution(resolution, "css", selector)
                 return True
             except Exception as e:
-                print(f"Dropdown click failed: {e}")
+                logger.debug("Dropdown click failed: %s", e)
         
         element = await self._find_notion_element(page, selector_hint)
         if element:
             try:
-                await element.click(timeout=10000)
-                print(f"Clicked using contextual search: '{selector_hint}'")
+                key = strategy_key("contextual", selector_hint)
+                with strategy_span("click", "contextual"), adaptive_timeouts.track("click", key, page.url):
+                    await element.click(timeout=adaptive_timeouts.timeout_ms("click", key, page.url, 10000))
+                logger.debug("Clicked using contextual search: '%s'", selector_hint)
                 if "more options" in selector_hint.lower() or "v" in selector_hint.lower():
+                    self._record_resolution(resolution, *await self._describe_element(element))
                     return True
                     
             except Exception as e:
-                print(f"Contextual click failed: {e}")
+                logger.debug("Contextual click failed: %s", e)
             
         strategies = self._get_notion_click_strategies(selector_hint)
         
         last_error = None
         for strategy in strategies:
+            check_deadline()
             try:
-                print(f"Trying click: {strategy['type']} -> '{strategy['value']}'")
-                
-                if strategy["type"] == "text":
-                    await page.click(f"text={strategy['value']}", timeout=10000)
-                    print(f"Clicked: '{strategy['value']}'")
-                    if "more options" in selector_hint.lower() or "v" in selector_hint.lower():
-                        await asyncio.sleep(1)
-                        
-                    return True
-                elif strategy["type"] == "css":
-                    await page.click(strategy["value"], timeout=10000)
-                    print(f"Clicked CSS: {strategy['value']}")
+                logger.debug("Trying click: %s -> '%s'", strategy['type'], strategy['value'])
+                key = strategy_key(strategy["type"], strategy["value"])
+                timeout = adaptive_timeouts.timeout_ms("click", key, page.url, 10000)
+                with strategy_span("click", strategy["type"]), adaptive_timeouts.track("click", key, page.url):
+                    if strategy["type"] == "text":
+                        await page.click(f"text={strategy['value']}", timeout=timeout)
+                        logger.debug("Clicked: '%s'", strategy['value'])
+                        opens_menu = "more options" in selector_hint.lower() or "v" in selector_hint.lower()
+                        if opens_menu:
+                            await asyncio.sleep(1)
 
-                    if "more options" in selector_hint.lower() or "v" in selector_hint.lower():
-                        await asyncio.sleep(1)
-                        
-                    return True
-                elif strategy["type"] == "xpath":
-                    await page.click(f"xpath={strategy['value']}", timeout=10000)
-                    print(f"Clicked XPath: {strategy['value']}")
+                        self._record_resolution(resolution, strategy["type"], strategy["value"], 1.0 if opens_menu else 0.0)
+                        return True
+                    elif strategy["type"] == "css":
+                        await page.click(strategy["value"], timeout=timeout)
+                        logger.debug("Clicked CSS: %s", strategy['value'])
 
-                    if "more options" in selector_hint.lower() or "v" in selector_hint.lower():
-                        await asyncio.sleep(1)
-                        
-                    return True
+                        opens_menu = "more options" in selector_hint.lower() or "v" in selector_hint.lower()
+                        if opens_menu:
+                            await asyncio.sleep(1)
+
+                        self._record_resolution(resolution, strategy["type"], strategy["value"], 1.0 if opens_menu else 0.0)
+                        return True
+                    elif strategy["type"] == "xpath":
+                        await page.click(f"xpath={strategy['value']}", timeout=timeout)
+                        logger.debug("Clicked XPath: %s", strategy['value'])
+
+                        opens_menu = "more options" in selector_hint.lower() or "v" in selector_hint.lower()
+                        if opens_menu:
+                            await asyncio.sleep(1)
+
+                        self._record_resolution(resolution, strategy["type"], strategy["value"], 1.0 if opens_menu else 0.0)
+                        return True
             except Exception as e:
                 last_error = e
-                print(f"Click failed: {e}")
+                logger.debug("Click failed: %s", e)
                 continue
                 
-        print(f"Notion element not found: {selector_hint}. Error: {last_error}")
+        logger.warning("Notion element not found: %s. Error: %s", selector_hint, last_error)
         return False
 
-    async def _smart_fill(self, page, selector_hint: str, value: str, app: str) -> bool:
+    async def _smart_fill(
+        self, page, selector_hint: str, value: str, app: str, resolution: Dict[str, Any] = None
+    ) -> bool:
         """Fill a field and return True if successful"""
         if not selector_hint or selector_hint.strip() == "":
             return False
@@ -332,55 +823,88 @@ class CaptureService:
         
         last_error = None
         for strategy in strategies:
+            check_deadline()
             try:
-                print(f"Trying fill: {strategy['type']} -> '{strategy['value']}'")
-                
-                if strategy["type"] == "css":
-                    await page.fill(strategy["value"], value, timeout=10000)
-                    print(f"Filled CSS: {strategy['value']}")
-                    return True
-                elif strategy["type"] == "placeholder":
-                    selector = f"input[placeholder*='{strategy['value']}'], textarea[placeholder*='{strategy['value']}']"
-                    await page.fill(selector, value, timeout=10000)
-                    print(f"Filled placeholder: {strategy['value']}")
-                    return True
-                elif strategy["type"] == "contenteditable":
-                    title_selectors = [
-                        ".notion-page-block .notranslate[contenteditable='true']",
-                        "[data-placeholder*='Untitled']",
-                        "[data-placeholder*='Title']",
-                        ".page-title [contenteditable='true']",
-                        ".notion-page-content [contenteditable='true']:first-child"
-                    ]
+                logger.debug("Trying fill: %s -> '%s'", strategy['type'], strategy['value'])
+                key = strategy_key(strategy["type"], strategy["value"])
+                timeout = adaptive_timeouts.timeout_ms("fill", key, page.url, 10000)
+                with strategy_span("fill", strategy["type"]), adaptive_timeouts.track("fill", key, page.url):
+                    if strategy["type"] == "css":
+                        mode = await input_engine.fill_selector(page, strategy["value"], value, timeout=timeout)
+                        logger.debug("Filled CSS (%s): %s", mode, strategy['value'])
+                        self._record_resolution(resolution, "css", strategy["value"])
+                        self._record_input_mode(resolution, mode)
+                        return True
+                    elif strategy["type"] == "placeholder":
+                        selector = f"input[placeholder*='{strategy['value']}'], textarea[placeholder*='{strategy['value']}']"
+                        mode = await input_engine.fill_selector(page, selector, value, timeout=timeout)
+                        logger.debug("Filled placeholder (%s): %s", mode, strategy['value'])
+                        self._record_resolution(resolution, "css", selector)
+                        self._record_input_mode(resolution, mode)
+                        return True
+                    elif strategy["type"] == "contenteditable":
+                        title_selectors = [
+                            ".notion-page-block .notranslate[contenteditable='true']",
+                            "[data-placeholder*='Untitled']",
+                            "[data-placeholder*='Title']",
+                            ".page-title [contenteditable='true']",
+                            ".notion-page-content [contenteditable='true']:first-child"
+                        ]
                     
-                    for title_selector in title_selectors:
-                        try:
-                            element = await page.query_selector(title_selector)
-                            if element:
-                                await element.click()
-                                await element.evaluate("(el) => el.innerText = ''")
-                                await element.type(value, delay=50)
-                                print(f"Filled title field: {value}")
+                        for title_selector in title_selectors:
+                            try:
+                                element = await page.query_selector(title_selector)
+                                if element:
+                                    mode = await input_engine.fill_element(page, element, value)
+                                    logger.debug("Filled title field (%s): %s", mode, value)
+                                    self._record_resolution(resolution, "contenteditable", title_selector)
+                                    self._record_input_mode(resolution, mode)
+                                    return True
+                            except Exception as e:
+                                continue
+                        element = await page.query_selector("[contenteditable='true']")
+                        if element:
+                            placeholder = await element.get_attribute("data-placeholder") or ""
+                            if "untitled" in placeholder.lower() or "title" in placeholder.lower():
+                                mode = await input_engine.fill_element(page, element, value)
+                                logger.debug("Filled contenteditable title (%s): %s", mode, value)
+                                self._record_resolution(resolution, "contenteditable", "[contenteditable='true']")
+                                self._record_input_mode(resolution, mode)
                                 return True
-                        except Exception as e:
-                            continue
-                    element = await page.query_selector("[contenteditable='true']")
-                    if element:
-                        placeholder = await element.get_attribute("data-placeholder") or ""
-                        if "untitled" in placeholder.lower() or "title" in placeholder.lower():
-                            await element.click()
-                            await element.evaluate("(el) => el.innerText = ''")
-                            await element.type(value, delay=50)
-                            print(f"Filled contenteditable title: {value}")
-                            return True
             except Exception as e:
                 last_error = e
-                print(f"Fill failed: {e}")
+                logger.debug("Fill failed: %s", e)
                 continue
                 
-        print(f"Notion input not found: {selector_hint}. Error: {last_error}")
+        logger.warning("Notion input not found: %s. Error: %s", selector_hint, last_error)
         return False
 
+    def _record_resolution(
+        self, resolution: Dict[str, Any], strategy_type: str, value: str, wait_after: float = 0.0
+    ):
+        if resolution is not None:
+            resolution.update({"type": strategy_type, "value": value, "wait_after": wait_after})
+
+    def _record_input_mode(self, resolution: Dict[str, Any], mode: str):
+        if resolution is not None:
+            resolution["input_mode"] = mode
+
+    async def _describe_element(self, element):
+        """Turn an element handle found by contextual search into a reusable selector"""
+        text = (await element.inner_text() or "").strip()
+        if text and "\n" not in text:
+            return "text", text
+        aria_label = await element.get_attribute("aria-label")
+        if aria_label:
+            return "css", f"[aria-label={self._css_string(aria_label)}]"
+        return "text", text.split("\n")[0]
+
+    def _css_string(self, value: str) -> str:
+        """Quote ``value`` as a CSS string so labels with quotes or backslashes stay valid selectors"""
+        escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+        escaped = escaped.replace("\n", "\\a ").replace("\r", "\\d ")
+        return f'"{escaped}"'
+
     def _get_notion_click_strategies(self, selector_hint: str) -> List[Dict]:
         strategies = []
         hint_lower = selector_hint.lower()
@@ -488,11 +1012,11 @@ class CaptureService:
     async def _smart_press(self, page, selector_hint: str, value: str) -> bool:
         try:
             key = value.upper() if value else "ENTER"
-            print(f"Pressing key: {key}")
+            logger.debug("Pressing key: %s", key)
             await page.keyboard.press(key)
             return True
         except Exception as e:
-            print(f"Key press failed: {e}")
+            logger.warning("Key press failed: %s", e)
             return False
 
     async def _find_notion_element(self, page, hint: str):
@@ -525,7 +1049,7 @@ class CaptureService:
         
         return None
 
-    async def _verify_action(self, page, step: Dict, previous_screenshot: bytes = None) -> bool:
+    async def _verify_action(self, page, step: Dict) -> bool:
         try:
             await asyncio.sleep(1)
 
@@ -0,0 +1,82 @@
+from typing import Optional
+from app.utils.config import settings
+from app.utils.log import get_logger
+from app.utils.metrics import registry
+
+logger = get_logger(__name__)
+
+INPUT_MODES = registry.counter("softlight_input_mode_total", "Fill steps by input mode used and outcome.")
+
+READ_VALUE = "(el) => el.isContentEditable ? el.innerText : (el.value ?? el.textContent ?? '')"
+
+
+class InputEngine:
+    """Enters text into inputs and contenteditable fields.
+
+    Modes: ``fill`` uses Playwright's native fill, ``insert`` inserts the whole value
+    as one input event, and ``type`` types key by key with a delay. ``auto`` picks
+    ``fill`` for form controls and ``insert`` for contenteditable elements, falling
+    back to ``type`` if the text did not land.
+    """
+
+    MODES = ("auto", "fill", "insert", "type")
+
+    def __init__(self, mode: str = "auto", typing_delay_ms: int = 50):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown input mode '{mode}', expected one of {self.MODES}")
+        self.mode = mode
+        self.typing_delay_ms = typing_delay_ms
+
+    async def fill_selector(self, page, selector: str, value: str, timeout: float = 10000) -> str:
+        element = await page.wait_for_selector(selector, state="visible", timeout=timeout)
+        return await self.fill_element(page, element, value)
+
+    async def fill_element(self, page, element, value: str) -> str:
+        """Enter ``value`` and verify it landed; returns the mode that was used"""
+        value = value or ""
+        editable = await element.evaluate("(el) => el.isContentEditable")
+        mode = self.mode
+        if mode == "auto":
+            mode = "insert" if editable else "fill"
+
+        await self._enter(page, element, value, mode)
+        if await self._landed(element, value):
+            INPUT_MODES.inc(mode=mode, outcome="ok")
+            return mode
+
+        INPUT_MODES.inc(mode=mode, outcome="retry")
+        if mode != "type":
+            logger.debug("Input mode %s did not land, retrying with typing", mode)
+            mode = "type"
+            await self._enter(page, element, value, mode)
+            if await self._landed(element, value):
+                INPUT_MODES.inc(mode=mode, outcome="ok")
+                return mode
+
+        INPUT_MODES.inc(mode=mode, outcome="failed")
+        raise ValueError(f"Entered text did not appear in the field (mode: {mode})")
+
+    async def _enter(self, page, element, value: str, mode: str):
+        if mode == "fill":
+            await element.fill(value)
+            return
+
+        await element.click()
+        # Select the existing content so the new value replaces it.
+        await page.keyboard.press("ControlOrMeta+A")
+        if mode == "insert":
+            await page.keyboard.insert_text(value)
+        else:
+            await page.keyboard.press("Backspace")
+            await element.press_sequentially(value, delay=self.typing_delay_ms)
+
+    async def _landed(self, element, value: str) -> bool:
+        try:
+            current: Optional[str] = await element.evaluate(READ_VALUE)
+        except Exception:
+            return False
+        expected = " ".join(value.split())
+        return expected in " ".join((current or "").split())
+
+
+input_engine = InputEngine(settings.INPUT_MODE, settings.TYPING_DELAY_MS)
@@ -0,0 +1,238 @@
+import json
+import re
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+from app.utils.config import settings
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+WORKSPACE_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    app TEXT NOT NULL,
+    instruction TEXT NOT NULL,
+    workspace TEXT,
+    record_macro TEXT,
+    deadline_seconds REAL,
+    status TEXT NOT NULL,
+    worker_id TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    capacity INTEGER NOT NULL,
+    active INTEGER NOT NULL,
+    warm_workspaces TEXT NOT NULL,
+    heartbeat_at REAL NOT NULL
+);
+"""
+
+
+class JobQueue:
+    """Shared task queue for worker processes, stored in SQLite.
+
+    Any number of API servers enqueue and any number of ``python -m app.worker``
+    processes claim, as long as they share the database file. Workers heartbeat
+    their capacity and the workspaces they hold a logged-in profile for, and a
+    job for a workspace goes to a worker that is already warm for it when one is
+    alive; after ``AFFINITY_WAIT_SECONDS`` any worker may take it. Jobs of workers
+    that stop heartbeating are re-queued, up to ``JOB_MAX_ATTEMPTS`` claims.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._initialized = False
+
+    def is_valid_workspace(self, workspace: str) -> bool:
+        return bool(WORKSPACE_PATTERN.match(workspace or ""))
+
+    def enqueue(
+        self,
+        app: str,
+        instruction: str,
+        workspace: Optional[str] = None,
+        record_macro: Optional[str] = None,
+        deadline_seconds: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex[:16]
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs (id, app, instruction, workspace, record_macro, deadline_seconds, status, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, 'queued', ?)",
+                (job_id, app, instruction, workspace, record_macro, deadline_seconds, time.time())
+            )
+        logger.info("Queued job %s for workspace %s", job_id, workspace or "-")
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def claim(
+        self, worker_id: str, warm_workspaces: List[str], busy_workspaces: Iterable[Optional[str]] = ()
+    ) -> Optional[Dict[str, Any]]:
+        """Atomically take the next job this worker should run, or None.
+
+        Jobs for ``busy_workspaces`` are skipped: a browser profile can only be
+        open once, so the worker could not start them yet.
+        """
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            # A cold profile means a fresh login, so a job waits for a warm worker
+            # even when that worker is busy, up to AFFINITY_WAIT_SECONDS.
+            warm_elsewhere = set()
+            for row in self._live_worker_rows(db, now):
+                if row["id"] != worker_id:
+                    warm_elsewhere.update(json.loads(row["warm_workspaces"]))
+
+            queued = db.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 200"
+            ).fetchall()
+            busy = set(busy_workspaces)
+            queued = [row for row in queued if row["workspace"] not in busy]
+            job = self._pick(queued, set(warm_workspaces), warm_elsewhere, now)
+            if job is None:
+                return None
+            db.execute(
+                "UPDATE jobs SET status = 'running', worker_id = ?, started_at = ?, attempts = attempts + 1"
+                " WHERE id = ?",
+                (worker_id, now, job["id"])
+            )
+        return self.get(job["id"])
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        return self._finish(
+            job_id, worker_id, "status = 'completed', finished_at = ?, result = ?", (time.time(), json.dumps(result))
+        )
+
+    def fail(self, job_id: str, worker_id: str, error: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        return self._finish(
+            job_id, worker_id, "status = 'failed', finished_at = ?, error = ?, result = ?",
+            (time.time(), error, json.dumps(result) if result is not None else None)
+        )
+
+    def _finish(self, job_id: str, worker_id: str, assignments: str, values: tuple) -> bool:
+        """Store the outcome only while ``worker_id`` still holds the job.
+
+        A worker that was presumed dead may finish after its job was re-queued and
+        claimed by someone else; its late outcome must not overwrite that run.
+        """
+        with self._connect() as db:
+            updated = db.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (*values, job_id, worker_id)
+            ).rowcount
+        if not updated:
+            logger.warning("Dropped outcome of job %s from worker %s, which no longer holds it", job_id, worker_id)
+        return bool(updated)
+
+    def heartbeat(self, worker_id: str, capacity: int, active: int, warm_workspaces: List[str]):
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO workers (id, host, capacity, active, warm_workspaces, heartbeat_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET capacity = excluded.capacity, active = excluded.active,"
+                " warm_workspaces = excluded.warm_workspaces, heartbeat_at = excluded.heartbeat_at",
+                (worker_id, socket.gethostname(), capacity, active, json.dumps(sorted(warm_workspaces)), time.time())
+            )
+
+    def deregister(self, worker_id: str):
+        with self._connect() as db:
+            db.execute("DELETE FROM workers WHERE id = ?", (worker_id,))
+
+    def live_workers(self) -> List[Dict[str, Any]]:
+        with self._connect() as db:
+            rows = self._live_worker_rows(db, time.time())
+        return [{**dict(row), "warm_workspaces": json.loads(row["warm_workspaces"])} for row in rows]
+
+    def requeue_stale(self) -> int:
+        """Put jobs held by workers that stopped heartbeating back in the queue.
+
+        A job that has already been claimed ``JOB_MAX_ATTEMPTS`` times is failed
+        instead, so a job that keeps taking its worker down does not loop forever.
+        """
+        now = time.time()
+        cutoff = now - settings.WORKER_TIMEOUT_SECONDS
+        orphaned = "status = 'running' AND worker_id NOT IN (SELECT id FROM workers WHERE heartbeat_at >= ?)"
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            failed = db.execute(
+                f"UPDATE jobs SET status = 'failed', finished_at = ?, error = ? WHERE {orphaned} AND attempts >= ?",
+                (
+                    now,
+                    f"Worker stopped responding on each of {settings.JOB_MAX_ATTEMPTS} attempts",
+                    cutoff,
+                    settings.JOB_MAX_ATTEMPTS,
+                )
+            ).rowcount
+            requeued = db.execute(
+                f"UPDATE jobs SET status = 'queued', worker_id = NULL, started_at = NULL WHERE {orphaned}",
+                (cutoff,)
+            ).rowcount
+            db.execute("DELETE FROM workers WHERE heartbeat_at < ?", (cutoff,))
+        if failed:
+            logger.error("Failed %s jobs whose workers stopped responding %s times", failed, settings.JOB_MAX_ATTEMPTS)
+        if requeued:
+            logger.warning("Re-queued %s jobs from unresponsive workers", requeued)
+        return requeued
+
+    def _pick(self, queued, warm_here: set, warm_elsewhere: set, now: float) -> Optional[Dict[str, Any]]:
+        fallback = None
+        for row in queued:
+            workspace = row["workspace"]
+            if workspace and workspace in warm_here:
+                return row
+            if fallback is not None:
+                continue
+            waited = now - row["created_at"]
+            if not workspace or workspace not in warm_elsewhere or waited >= settings.AFFINITY_WAIT_SECONDS:
+                fallback = row
+        return fallback
+
+    def _live_worker_rows(self, db, now: float):
+        return db.execute(
+            "SELECT * FROM workers WHERE heartbeat_at >= ? ORDER BY id", (now - settings.WORKER_TIMEOUT_SECONDS,)
+        ).fetchall()
+
+    def _job(self, row) -> Dict[str, Any]:
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            if not self._initialized:
+                db.execute("PRAGMA journal_mode=WAL")
+                db.executescript(SCHEMA)
+                self._initialized = True
+            yield db
+            if db.in_transaction:
+                db.execute("COMMIT")
+        except Exception:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+
+job_queue = JobQueue(settings.JOB_QUEUE_PATH)
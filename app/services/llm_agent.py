@@ -1,13 +1,35 @@
+import asyncio
 import json
 import re
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
 from app.utils.groq_client import groq_client
 from app.utils.config import settings
+from app.utils.log import get_logger
+from app.utils.plan_cache import PlanCache
+from app.utils.rate_limiter import TokenBucket
+from app.utils.metrics import span, LLM_PARSES, LLM_TOKENS, PLAN_CACHE, REPLANS
+
+logger = get_logger(__name__)
+
+_plan_trace: ContextVar[Optional[Dict[str, Any]]] = ContextVar("plan_trace", default=None)
+
+
+def start_plan_trace() -> Dict[str, Any]:
+    """Collect what the planner did for the current task: cache lookups, LLM calls,
+    token usage, raw model output and how it parsed. Used by the debug endpoint and
+    the planner evaluation harness."""
+    trace = {"cache": [], "llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "raw_outputs": [], "parses": []}
+    _plan_trace.set(trace)
+    return trace
 
 class LLMAgent:
     def __init__(self):
         self.client = groq_client
+        self.rate_limiter = TokenBucket(settings.LLM_REQUESTS_PER_MINUTE / 60, settings.LLM_BURST)
+        self._plan_cache = PlanCache(settings.PLAN_CACHE_SIZE, settings.PLAN_CACHE_TTL_SECONDS)
 
-    def generate_steps(self, app: str, instruction: str):
+    def generate_steps(self, app: str, instruction: str, page_context: dict = None):
         notion_knowledge = """
         NOTION UI KNOWLEDGE:
         - To create database: Click "More Options (v shaped button)" → Click "Database" → Database is created immediately with "Untitled" field ready to fill
@@ -92,6 +114,7 @@ class LLMAgent:
         }}
         ]
         
+        {self._build_context_prompt(page_context)}
         Now generate steps for: "{instruction}"
         
         Output ONLY valid JSON array with exact Notion UI elements.
@@ -104,8 +127,39 @@ class LLMAgent:
             max_tokens=500
         )
 
+        self._record_usage(response)
         raw_output = response.choices[0].message.content.strip()
+        return self._parse_steps(raw_output)
 
+    def _record_usage(self, response):
+        trace = _plan_trace.get()
+        if trace is not None:
+            trace["llm_calls"] += 1
+            trace["raw_outputs"].append(response.choices[0].message.content)
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        LLM_TOKENS.inc(prompt_tokens, kind="prompt")
+        LLM_TOKENS.inc(completion_tokens, kind="completion")
+        if trace is not None:
+            trace["prompt_tokens"] += prompt_tokens
+            trace["completion_tokens"] += completion_tokens
+
+    def _record_parse(self, outcome: str):
+        LLM_PARSES.inc(outcome=outcome)
+        trace = _plan_trace.get()
+        if trace is not None:
+            trace["parses"].append(outcome)
+
+    def _record_cache(self, outcome: str):
+        PLAN_CACHE.inc(outcome=outcome)
+        trace = _plan_trace.get()
+        if trace is not None:
+            trace["cache"].append(outcome)
+
+    def _parse_steps(self, raw_output: str) -> list:
         match = re.search(r'\[.*\]', raw_output, re.DOTALL)
         if match:
             json_str = match.group(0)
@@ -127,27 +181,108 @@ class LLMAgent:
                         "url": step.get("url")
                     }
                     validated_steps.append(validated_step)
+                self._record_parse("ok" if validated_steps else "empty")
                 return validated_steps
             else:
-                print("Model returned non-list structure")
+                logger.warning("Model returned non-list structure")
+                self._record_parse("not_a_list")
                 return []
                 
         except json.JSONDecodeError as e:
-            print("JSON parse error:", e)
-            print("Raw JSON:", json_str)
+            logger.warning("JSON parse error: %s", e)
+            logger.debug("Raw JSON: %s", json_str)
+            self._record_parse("json_error")
             return []
 
     async def analyze_page_and_generate_steps(self, app: str, instruction: str, page_context: dict = None):
-        print(f"Generating steps for: {app} - {instruction}")
+        logger.debug("Generating steps for: %s - %s", app, instruction)
         if page_context:
-            print(f"Page context available: {page_context.get('url', 'No URL')}")
+            logger.debug("Page context available: %s", page_context.get('url', 'No URL'))
+
+        # The plan depends on the instruction and on the page as the prompt sees it,
+        # so the key includes that part of the context; entries also expire.
+        cache_key = (app, instruction, self._build_context_prompt(page_context))
+        cached = self._plan_cache.get(cache_key)
+        if cached is not None:
+            self._record_cache("hit")
+            logger.debug("Plan cache hit for: %s", instruction)
+            return cached
+        self._record_cache("miss")
+
+        await self.rate_limiter.acquire()
+        # The Groq client is synchronous; run it off the event loop so planning
+        # can overlap with browser startup.
+        with span("llm_planning"):
+            steps = await asyncio.to_thread(self.generate_steps, app, instruction, page_context)
+
+        if steps:
+            self._plan_cache.put(cache_key, steps)
+        return steps
+
+    async def plan_batch(self, app: str, instructions: List[str]) -> List[list]:
+        """Plan every instruction concurrently; the rate limiter paces the actual requests."""
+        unique = list(dict.fromkeys(instructions))
+
+        async def plan(instruction: str):
+            try:
+                return await self.analyze_page_and_generate_steps(app, instruction)
+            except Exception as e:
+                logger.warning("Batch planning failed for '%s': %s", instruction, e)
+                return []
+
+        plans = dict(zip(unique, await asyncio.gather(*(plan(i) for i in unique))))
+        return [[dict(step) for step in plans[instruction]] for instruction in instructions]
+
+    def generate_replan(self, app: str, instruction: str, failed_step: dict,
+                        remaining_steps: list, page_delta: dict, error: str = None):
+        prompt = f"""
+        You are repairing a Notion automation plan that failed part-way through.
 
-        return self.generate_steps(app, instruction)
+        App: {app}
+        Original instruction: {instruction}
+        Failed step: {json.dumps(failed_step)}
+        Error: {error or "unknown"}
+        Remaining planned steps: {json.dumps(remaining_steps)}
+        Page changes since the last successful step: {json.dumps(page_delta)}
+
+        Return the steps that should run NOW, starting with a replacement for the failed step,
+        followed by whatever is still needed to finish the instruction.
+        Use the same step format: action, selector_hint, description, value, url.
+        Prefer selector hints that appear in the visible page elements.
+
+        Output ONLY a valid JSON array.
+        """
+
+        response = self.client.chat.completions.create(
+            model=settings.MODEL_NAME,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.1,
+            max_tokens=500
+        )
+
+        self._record_usage(response)
+        raw_output = response.choices[0].message.content.strip()
+        return self._parse_steps(raw_output)
+
+    async def replan_steps(self, app: str, instruction: str, failed_step: dict,
+                           remaining_steps: list, page_delta: dict, error: str = None):
+        logger.info("Re-planning after failed step: %s", failed_step.get('selector_hint'))
+        await self.rate_limiter.acquire()
+        with span("llm_replanning"):
+            steps = await asyncio.to_thread(
+                self.generate_replan, app, instruction, failed_step, remaining_steps, page_delta, error
+            )
+        REPLANS.inc(outcome="revised" if steps else "empty")
+        return steps
 
     async def generate_steps_direct_test(self, app: str, instruction: str, page_context: dict = None):
+        trace = start_plan_trace()
         steps = await self.analyze_page_and_generate_steps(app, instruction, page_context)
         return {
-            "raw_output": "See server logs",
+            "raw_output": trace["raw_outputs"][-1] if trace["raw_outputs"] else None,
+            "cache": trace["cache"][-1] if trace["cache"] else "bypass",
+            "parse": trace["parses"][-1] if trace["parses"] else None,
+            "tokens": {"prompt": trace["prompt_tokens"], "completion": trace["completion_tokens"]},
             "parsed_steps": steps,
             "prompt_used": f"Simple prompt for {app} - {instruction}",
             "page_context": page_context or {}
@@ -158,6 +293,19 @@ class LLMAgent:
             return "No page context"
         return f"URL: {page_context.get('url', 'Unknown')}, Title: {page_context.get('title', 'Unknown')}"
 
+    def _build_context_prompt(self, page_context: dict) -> str:
+        if not page_context or not page_context.get("interactive_elements"):
+            return ""
+        labels = []
+        for element in page_context["interactive_elements"]:
+            label = element.get("text") or element.get("aria_label")
+            if label and label not in labels:
+                labels.append(label)
+        return (
+            f"CURRENT PAGE: {self._build_context_description(page_context)}\n"
+            f"        Visible elements: {', '.join(labels[:30])}\n"
+        )
+
     def _parse_json_response(self, raw_output: str):
         return self.generate_steps("temp", "temp")
 
@@ -0,0 +1,111 @@
+import json
+import os
+import re
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from app.utils.config import settings
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+SLOT_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+
+
+class MacroService:
+    """Stores successful runs as compiled macros that can be replayed without the LLM."""
+
+    def __init__(self, macro_dir: str):
+        self.macro_dir = macro_dir
+
+    def record(self, name: str, app: str, instruction: str, captured_steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+        steps = []
+        params = {}
+
+        for step in captured_steps:
+            if step.get("recovered"):
+                continue
+
+            value = step.get("value")
+            if step.get("action") == "fill" and value is not None:
+                # Filled values become parameter slots so the macro can be replayed
+                # with a different database name, search query and so on.
+                slot = self._slot_name(step.get("selector_hint") or "value", params)
+                params[slot] = value
+                value = f"{{{{{slot}}}}}"
+
+            steps.append({
+                "action": step.get("action"),
+                "selector_hint": step.get("selector_hint"),
+                "description": step.get("description"),
+                "value": value,
+                "url": step.get("url") if step.get("action") == "navigate" else None,
+                "resolved": step.get("resolved"),
+            })
+
+        macro = {
+            "name": name,
+            "app": app,
+            "instruction": instruction,
+            "params": params,
+            "steps": steps,
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+        os.makedirs(self.macro_dir, exist_ok=True)
+        with open(self._path(name), "w", encoding="utf-8") as f:
+            json.dump(macro, f, indent=2)
+        logger.info("Recorded macro '%s' with %s steps", name, len(steps))
+        return macro
+
+    def load(self, name: str) -> Optional[Dict[str, Any]]:
+        path = self._path(name)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def list_macros(self) -> List[Dict[str, Any]]:
+        if not os.path.isdir(self.macro_dir):
+            return []
+
+        macros = []
+        for filename in sorted(os.listdir(self.macro_dir)):
+            if filename.endswith(".json"):
+                macro = self.load(filename[:-5])
+                if macro:
+                    macros.append({
+                        "name": macro["name"],
+                        "app": macro["app"],
+                        "instruction": macro["instruction"],
+                        "params": macro["params"],
+                    })
+        return macros
+
+    def bind(self, macro: Dict[str, Any], params: Dict[str, str] = None) -> List[Dict[str, Any]]:
+        """Fill the parameter slots of a macro, falling back to the recorded values"""
+        values = {**macro.get("params", {}), **(params or {})}
+
+        def substitute(text):
+            if not isinstance(text, str):
+                return text
+            return SLOT_PATTERN.sub(lambda m: str(values.get(m.group(1), m.group(0))), text)
+
+        return [{**step, "value": substitute(step.get("value"))} for step in macro["steps"]]
+
+    @staticmethod
+    def is_valid_name(name: str) -> bool:
+        return bool(re.fullmatch(r"[A-Za-z0-9_-]{1,64}", name or ""))
+
+    def _slot_name(self, hint: str, existing: Dict[str, Any]) -> str:
+        base = re.sub(r"[^a-z0-9]+", "_", hint.lower()).strip("_") or "value"
+        slot = base
+        suffix = 2
+        while slot in existing:
+            slot = f"{base}_{suffix}"
+            suffix += 1
+        return slot
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.macro_dir, f"{name}.json")
+
+macro_service = MacroService(settings.MACRO_DIR)
@@ -1,9 +1,14 @@
-import asyncio
-from typing import List, Dict, Any
-from playwright.async_api import Page
+from typing import TYPE_CHECKING, List, Dict, Any
+from app.services.role_classifier import role_classifier
+from app.utils.log import get_logger
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
+logger = get_logger(__name__)
 
 class PageAnalyzer:
-    async def analyze_page(self, page: Page) -> Dict[str, Any]:
+    async def analyze_page(self, page: "Page") -> Dict[str, Any]:
         try:
             url = page.url
             title = await page.title()
@@ -22,10 +27,10 @@ class PageAnalyzer:
                 "has_login_form": await self._has_notion_login(page)
             }
         except Exception as e:
-            print(f"Notion page analysis error: {e}")
+            logger.error("Notion page analysis error: %s", e)
             return self._get_fallback_analysis()
 
-    async def _get_notion_elements(self, page: Page) -> List[Dict[str, Any]]:
+    async def _get_notion_elements(self, page: "Page") -> List[Dict[str, Any]]:
         elements = []
 
         notion_selectors = [
@@ -44,6 +49,8 @@ class PageAnalyzer:
             except Exception:
                 continue
 
+        role_classifier.classify_many(elements)
+
         seen = set()
         unique_elements = []
         for elem in elements:
@@ -63,39 +70,16 @@ class PageAnalyzer:
             data_testid = await element.get_attribute("data-testid") or ""
             classes = await element.get_attribute("class") or ""
 
-            role = await self._determine_notion_element_role(text, aria_label, data_testid)
-            
             return {
                 "text": text,
                 "aria_label": aria_label,
                 "data_testid": data_testid,
                 "classes": classes,
-                "role": role,
                 "is_clickable": await self._is_element_clickable(element),
             }
         except Exception:
             return None
 
-    async def _determine_notion_element_role(self, text: str, aria_label: str, data_testid: str) -> str:
-        combined_text = (text + " " + aria_label + " " + data_testid).lower()
-
-        if any(word in combined_text for word in ["settings", "setting", "members"]):
-            return "settings"
-        elif any(word in combined_text for word in ["theme", "mode", "appearance", "dark", "light"]):
-            return "theme"
-        elif any(word in combined_text for word in ["new", "create", "add"]):
-            return "create_action"
-        elif any(word in combined_text for word in ["database", "table"]):
-            return "database"
-        elif any(word in combined_text for word in ["page", "document"]):
-            return "page"
-        elif any(word in combined_text for word in ["search", "find"]):
-            return "search"
-        elif any(word in combined_text for word in ["login", "sign in"]):
-            return "login"
-        else:
-            return "interactive_element"
-
     async def _is_element_clickable(self, element) -> bool:
         try:
             is_visible = await element.is_visible()
@@ -104,7 +88,7 @@ class PageAnalyzer:
         except Exception:
             return False
 
-    async def _analyze_notion_structure(self, page: Page) -> Dict[str, bool]:
+    async def _analyze_notion_structure(self, page: "Page") -> Dict[str, bool]:
         return {
             "has_sidebar": await self._has_element(page, ".notion-sidebar"),
             "has_header": await self._has_element(page, ".notion-header"),
@@ -112,14 +96,14 @@ class PageAnalyzer:
             "has_create_button": await self._has_element(page, "[data-testid*='create']"),
         }
 
-    async def _has_element(self, page: Page, selector: str) -> bool:
+    async def _has_element(self, page: "Page", selector: str) -> bool:
         try:
             element = await page.query_selector(selector)
             return element is not None and await element.is_visible()
         except Exception:
             return False
 
-    async def _get_notion_navigation(self, page: Page) -> List[Dict[str, Any]]:
+    async def _get_notion_navigation(self, page: "Page") -> List[Dict[str, Any]]:
         navigation_elements = []
 
         nav_selectors = [
@@ -162,7 +146,7 @@ class PageAnalyzer:
         
         return actions[:3]
 
-    async def _has_notion_login(self, page: Page) -> bool:
+    async def _has_notion_login(self, page: "Page") -> bool:
         try:
             return bool(await page.query_selector("input[type='password']"))
         except:
@@ -0,0 +1,135 @@
+import asyncio
+import fnmatch
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+from app.utils.config import settings
+from app.services.asset_cache import AssetCache, asset_cache
+from app.utils.log import get_logger
+from app.utils.metrics import registry
+
+logger = get_logger(__name__)
+
+ROUTED_REQUESTS = registry.counter(
+    "softlight_routed_requests_total", "Browser requests seen by the resource router, by decision."
+)
+
+# Third-party analytics and session-replay hosts that never affect the UI being automated.
+TRACKER_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googleadservices.com",
+    "segment.io", "segment.com", "amplitude.com", "mixpanel.com", "intercom.io", "intercomcdn.com",
+    "sentry.io", "hotjar.com", "fullstory.com", "facebook.net", "datadoghq-browser-agent.com",
+    "statsigapi.net", "launchdarkly.com", "crisp.chat", "customer.io",
+)
+
+# URL patterns each app needs even when their resource type is blocked, e.g. the
+# icon font Notion's buttons are drawn with.
+APP_ALLOW_LISTS: Dict[str, Tuple[str, ...]] = {
+    "notion": (
+        "*://*.notion.so/_assets/*.woff2",
+        "*://*.notion.so/images/emoji/*",
+        "*://*.notion.so/icons/*",
+    ),
+}
+
+
+class ResourceRouter:
+    """Blocks non-essential resource types and third-party trackers for a browser context,
+    and serves immutable static assets from the shared asset cache.
+
+    Installing a route disables Chromium's HTTP cache for the context, so the router
+    is only installed when it actually has something to do.
+    """
+
+    def __init__(
+        self,
+        blocked_types: Iterable[str],
+        block_trackers: bool,
+        extra_allow: Iterable[str] = (),
+        cache: Optional[AssetCache] = None,
+    ):
+        self.blocked_types = frozenset(t.lower() for t in blocked_types)
+        self.block_trackers = block_trackers
+        self.extra_allow = tuple(extra_allow)
+        self.cache = cache
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.blocked_types) or self.block_trackers or self.cache is not None
+
+    async def install(self, context, app: str = "Notion"):
+        if not self.enabled:
+            return
+        allow_list = APP_ALLOW_LISTS.get(app.lower(), ()) + self.extra_allow
+
+        async def handle(route, request):
+            reason = self.block_reason(request.url, request.resource_type, allow_list)
+            ROUTED_REQUESTS.inc(decision=reason or "allowed")
+            if reason:
+                await route.abort("blockedbyclient")
+            elif (
+                self.cache is not None
+                and request.method == "GET"
+                and self.cache.is_cacheable(request.url, request.resource_type)
+            ):
+                await self._serve_cached(route, request.url)
+            else:
+                await route.continue_()
+
+        await context.route("**/*", handle)
+        logger.debug("Resource router installed for %s (blocked types: %s)", app, sorted(self.blocked_types))
+
+    async def _serve_cached(self, route, url: str):
+        try:
+            cached = await asyncio.to_thread(self.cache.get, url)
+        except Exception as e:
+            logger.warning("Asset cache lookup failed for %s: %s", url, e)
+            cached = None
+        if cached:
+            await route.fulfill(status=200, headers=cached["headers"], body=cached["body"])
+            return
+
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except Exception as e:
+            # The request must still be answered, or the page load waits on it forever.
+            logger.warning("Fetching %s for the asset cache failed: %s", url, e)
+            await self._release(route)
+            return
+
+        if response.status == 200:
+            try:
+                await asyncio.to_thread(self.cache.put, url, body, response.headers)
+            except Exception as e:
+                logger.warning("Storing %s in the asset cache failed: %s", url, e)
+        await route.fulfill(response=response, body=body)
+
+    async def _release(self, route):
+        """Let the browser fetch the request itself, or abort it if that is no longer possible"""
+        try:
+            await route.continue_()
+        except Exception:
+            try:
+                await route.abort()
+            except Exception as e:
+                logger.debug("Route already handled: %s", e)
+
+    def block_reason(self, url: str, resource_type: str, allow_list: Tuple[str, ...] = ()) -> str:
+        """Return why a request should be blocked, or an empty string to let it through"""
+        if any(fnmatch.fnmatchcase(url, pattern) for pattern in allow_list):
+            return ""
+
+        host = urlsplit(url).hostname or ""
+        if self.block_trackers and any(host == t or host.endswith("." + t) for t in TRACKER_HOSTS):
+            return "tracker"
+        if resource_type in self.blocked_types:
+            return "resource_type"
+        return ""
+
+
+resource_router = ResourceRouter(
+    settings.BLOCKED_RESOURCE_TYPES,
+    settings.BLOCK_TRACKERS,
+    settings.RESOURCE_ALLOW_LIST,
+    asset_cache if settings.ASSET_CACHE_ENABLED else None,
+)
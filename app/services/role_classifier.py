@@ -0,0 +1,73 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List
+from app.utils.config import settings
+
+# Roles in priority order: when an element matches several, the earliest wins.
+ROLE_KEYWORDS = [
+    ("settings", ["settings", "setting", "members"]),
+    ("theme", ["theme", "mode", "appearance", "dark", "light"]),
+    ("create_action", ["new", "create", "add"]),
+    ("database", ["database", "table"]),
+    ("page", ["page", "document"]),
+    ("search", ["search", "find"]),
+    ("login", ["login", "sign in"]),
+]
+DEFAULT_ROLE = "interactive_element"
+
+
+def _build_pattern(role_keywords) -> "re.Pattern":
+    """One alternation, with one named group per role, ordered by priority.
+
+    It sits inside a lookahead, which tests every position without consuming
+    text, so keywords that overlap (``find`` in ``findatabase``) are all seen. A
+    first-character class in front skips positions where no keyword can start.
+    """
+    groups = [
+        f"(?P<r{i}>{'|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True))})"
+        for i, (_, words) in enumerate(role_keywords)
+    ]
+    first_chars = sorted({word[0] for _, words in role_keywords for word in words})
+    return re.compile(f"(?=[{re.escape(''.join(first_chars))}])(?=(?:{'|'.join(groups)}))")
+
+
+class RoleClassifier:
+    """Assigns a Notion role to an element from its text, aria-label and test id.
+
+    Substring semantics match the original keyword checks; results are memoized
+    because the same labels repeat across steps and tasks.
+    """
+
+    def __init__(self, cache_size: int):
+        self._roles = [role for role, _ in ROLE_KEYWORDS]
+        self._pattern = _build_pattern(ROLE_KEYWORDS)
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def _classify(self, text: str, aria_label: str = "", data_testid: str = "") -> str:
+        combined = f"{text} {aria_label} {data_testid}".lower()
+        best = len(self._roles)
+        for match in self._pattern.finditer(combined):
+            index = int(match.lastgroup[1:])
+            if index < best:
+                best = index
+                if best == 0:
+                    break
+        return self._roles[best] if best < len(self._roles) else DEFAULT_ROLE
+
+    def classify_many(self, elements: Iterable[Dict[str, Any]]) -> List[str]:
+        """Classify a list of element dicts and store each result under ``role``"""
+        roles = []
+        for element in elements:
+            role = self.classify(
+                element.get("text") or "", element.get("aria_label") or "", element.get("data_testid") or ""
+            )
+            element["role"] = role
+            roles.append(role)
+        return roles
+
+    def stats(self) -> Dict[str, int]:
+        info = self.classify.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
+
+
+role_classifier = RoleClassifier(settings.ROLE_CLASSIFIER_CACHE_SIZE)
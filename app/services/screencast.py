@@ -0,0 +1,184 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Set
+from app.utils.config import settings
+from app.utils.log import get_logger
+from app.utils.metrics import registry
+
+logger = get_logger(__name__)
+
+SCREENCAST_FRAMES = registry.counter(
+    "softlight_screencast_frames_total", "Screencast frames received from the browser, by outcome."
+)
+
+
+class ScreencastRecorder:
+    """Records a page through the CDP screencast instead of repeated screenshots.
+
+    Chromium pushes a compressed frame whenever the page repaints. Frames arriving
+    faster than ``max_fps`` or identical to the last stored one are dropped; the
+    rest are written to ``<run dir>/screencast/`` by a background writer, with a
+    ``manifest.json`` that lists each frame's offset and the step markers. The newest
+    frame is always kept in memory so per-step stills can be cut from the stream.
+    """
+
+    def __init__(self, out_dir: str, max_fps: float, quality: int):
+        self.out_dir = out_dir
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.quality = quality
+        self.frames: List[Dict[str, Any]] = []
+        self.markers: List[Dict[str, Any]] = []
+        self._cdp = None
+        self._started = 0.0
+        self._last_stored = float("-inf")
+        self._last_digest = None
+        self._latest: Optional[bytes] = None
+        self._queue: "asyncio.Queue[Optional[tuple]]" = asyncio.Queue()
+        self._writer: Optional[asyncio.Task] = None
+        # The event loop only keeps weak references to tasks, so pending acks are held here.
+        self._acks: Set[asyncio.Task] = set()
+
+    async def start(self, page):
+        os.makedirs(self.out_dir, exist_ok=True)
+        self._started = time.monotonic()
+        self._writer = asyncio.create_task(self._write_frames())
+        self._cdp = await page.context.new_cdp_session(page)
+        self._cdp.on("Page.screencastFrame", self._on_frame)
+        await self._cdp.send("Page.startScreencast", {
+            "format": "jpeg",
+            "quality": self.quality,
+            "maxWidth": settings.PLAYWRIGHT_VIEWPORT_WIDTH,
+            "maxHeight": settings.PLAYWRIGHT_VIEWPORT_HEIGHT,
+        })
+
+    def mark(self, event: str, **fields):
+        self.markers.append({"event": event, "t": round(time.monotonic() - self._started, 3), **fields})
+
+    async def still(self, path: str) -> bool:
+        """Write the newest frame to ``path``; False when no frame has arrived yet"""
+        if self._latest is None:
+            return False
+        await asyncio.to_thread(self._write_file, path, self._latest)
+        return True
+
+    async def stop(self):
+        if self._cdp is not None:
+            try:
+                await self._cdp.send("Page.stopScreencast")
+                if self._acks:
+                    await asyncio.wait(list(self._acks), timeout=1.0)
+                await self._cdp.detach()
+            except Exception as e:
+                logger.debug("Stopping screencast failed: %s", e)
+        for ack in list(self._acks):
+            ack.cancel()
+        if self._writer is not None:
+            await self._queue.put(None)
+            await self._writer
+        await asyncio.to_thread(self._write_manifest)
+        logger.info("Screencast stored %s frames in %s", len(self.frames), self.out_dir)
+
+    def _on_frame(self, params: Dict[str, Any]):
+        # Chromium stops sending frames until each one is acknowledged.
+        ack = asyncio.create_task(self._ack(params["sessionId"]))
+        self._acks.add(ack)
+        ack.add_done_callback(self._acks.discard)
+
+        data = base64.b64decode(params["data"])
+        self._latest = data
+        now = time.monotonic()
+        if now - self._last_stored < self.min_interval:
+            SCREENCAST_FRAMES.inc(outcome="throttled")
+            return
+        digest = hashlib.sha1(data).digest()
+        if digest == self._last_digest:
+            SCREENCAST_FRAMES.inc(outcome="duplicate")
+            return
+
+        self._last_stored = now
+        self._last_digest = digest
+        name = f"frame_{len(self.frames):05d}.jpg"
+        self.frames.append({"file": name, "t": round(now - self._started, 3)})
+        self._queue.put_nowait((os.path.join(self.out_dir, name), data))
+        SCREENCAST_FRAMES.inc(outcome="stored")
+
+    async def _ack(self, session_id: int):
+        try:
+            await self._cdp.send("Page.screencastFrameAck", {"sessionId": session_id})
+        except Exception:
+            pass
+
+    async def _write_frames(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            await asyncio.to_thread(self._write_file, *item)
+
+    def _write_file(self, path: str, data: bytes):
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def _write_manifest(self):
+        with open(os.path.join(self.out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "max_fps": round(1.0 / self.min_interval, 2) if self.min_interval else None,
+                "frames": self.frames,
+                "markers": self.markers,
+            }, f, indent=2)
+
+
+_current_recorder: ContextVar[Optional[ScreencastRecorder]] = ContextVar("screencast", default=None)
+
+
+async def start_recording(page, run_dir: str) -> Optional[ScreencastRecorder]:
+    """Start a screencast for the current task when ``CAPTURE_MODE`` asks for one"""
+    if settings.CAPTURE_MODE != "screencast":
+        return None
+    recorder = ScreencastRecorder(
+        os.path.join(run_dir, "screencast"), settings.SCREENCAST_MAX_FPS, settings.SCREENCAST_QUALITY
+    )
+    try:
+        await recorder.start(page)
+    except Exception as e:
+        logger.warning("Screencast unavailable, falling back to screenshots: %s", e)
+        return None
+    _current_recorder.set(recorder)
+    return recorder
+
+
+async def stop_recording(recorder: Optional[ScreencastRecorder]):
+    if recorder is None:
+        return
+    _current_recorder.set(None)
+    try:
+        await recorder.stop()
+    except Exception as e:
+        logger.error("Error stopping screencast: %s", e)
+
+
+def mark(event: str, **fields):
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.mark(event, **fields)
+
+
+async def capture_still(page, directory: str, name: str) -> str:
+    """Save a still of the page as ``<directory>/<name>`` and return its path.
+
+    While a screencast runs, the still is cut from the stream (JPEG) instead of
+    asking the browser for a fresh screenshot (PNG).
+    """
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        path = os.path.join(directory, f"{name}.jpg")
+        if await recorder.still(path):
+            return path
+    path = os.path.join(directory, f"{name}.png")
+    await page.screenshot(path=path)
+    return path
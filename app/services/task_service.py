@@ -1,19 +1,182 @@
-from app.models.task_models import TaskResponse, Step
+import asyncio
+import time
+from typing import Callable, Dict, List, Any, Optional
+from app.models.task_models import (
+    TaskResponse, Step, BatchTaskResponse, BatchTaskResult, BatchTiming
+)
 from app.services.capture_service import capture_service
 from app.services.llm_agent import llm_agent
+from app.services.macro_service import macro_service
+from app.utils.config import settings
+from app.utils.deadline import Deadline, set_deadline
+from app.utils.log import get_logger, new_task_id
+from app.utils.responses import dedupe_page_states
+from app.utils.metrics import start_task_timings, TASKS
+
+logger = get_logger(__name__)
 
 class TaskService:
-    async def process_task(self, app: str, instruction: str) -> TaskResponse:
-        steps_raw = llm_agent.generate_steps(app, instruction)
-        
-        steps_captured = await capture_service.execute_steps(app, instruction)
+    async def process_task(
+        self,
+        app: str,
+        instruction: str,
+        record_macro: Optional[str] = None,
+        include_timings: bool = False,
+        deadline_seconds: Optional[float] = None,
+        workspace: Optional[str] = None,
+        include_page_states: bool = False,
+    ) -> TaskResponse:
+        new_task_id()
+        logger.info("Task started: %s - %s", app, instruction)
+        started = time.perf_counter()
+        timings = start_task_timings()
+        deadline = set_deadline(settings.TASK_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds)
+        captured = []
+        steps_captured = await self._within_deadline(
+            capture_service.execute_steps(app, instruction, workspace, captured),
+            deadline,
+            lambda error_step: captured + [error_step]
+        )
+        timings["total"] = (time.perf_counter() - started) * 1000
+        logger.info("Task finished in %.0f ms with %s steps", timings["total"], len(steps_captured))
+        status = self._status(steps_captured)
+        TASKS.inc(kind="run", status=status)
+
+        if record_macro and steps_captured and status == "completed":
+            macro_service.record(record_macro, app, instruction, steps_captured)
         
-        normalized_steps = [Step(**s) for s in steps_captured]
+        normalized_steps, page_states = self._normalize_steps(steps_captured, include_page_states)
 
         return TaskResponse(
-            status="completed",
+            status=status,
             app=app,
             instruction=instruction,
-            steps=normalized_steps
+            steps=normalized_steps,
+            timings={phase: round(ms, 1) for phase, ms in timings.items()} if include_timings else None,
+            page_states=page_states
+        )
+
+    async def replay_macro(
+        self,
+        macro: Dict[str, Any],
+        params: Dict[str, str] = None,
+        deadline_seconds: Optional[float] = None,
+        include_page_states: bool = False,
+    ) -> TaskResponse:
+        new_task_id()
+        logger.info("Replaying macro '%s'", macro["name"])
+        deadline = set_deadline(settings.TASK_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds)
+        steps = macro_service.bind(macro, params)
+        captured = []
+        steps_captured = await self._within_deadline(
+            capture_service.replay_macro(steps, captured),
+            deadline,
+            lambda error_step: captured + [error_step]
+        )
+        status = self._status(steps_captured)
+        TASKS.inc(kind="replay", status=status)
+
+        normalized_steps, page_states = self._normalize_steps(steps_captured, include_page_states)
+        return TaskResponse(
+            status=status,
+            app=macro["app"],
+            instruction=macro["instruction"],
+            steps=normalized_steps,
+            page_states=page_states
+        )
+
+    async def process_batch(
+        self,
+        app: str,
+        instructions: List[str],
+        deadline_seconds: Optional[float] = None,
+        include_page_states: bool = False,
+    ) -> BatchTaskResponse:
+        new_task_id()
+        logger.info("Batch started: %s instructions for %s", len(instructions), app)
+        started = time.perf_counter()
+        deadline = set_deadline(settings.BATCH_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds)
+        plans = await llm_agent.plan_batch(app, instructions)
+        planned = time.perf_counter()
+
+        partial = []
+        outcomes = await self._within_deadline(
+            capture_service.execute_batch(app, instructions, plans, partial),
+            deadline,
+            lambda error_step: self._timed_out_batch(instructions, partial, error_step)
+        )
+        finished = time.perf_counter()
+        for outcome in outcomes:
+            TASKS.inc(kind="batch", status=self._status(outcome["steps"]))
+
+        results = []
+        for instruction, outcome in zip(instructions, outcomes):
+            normalized_steps, page_states = self._normalize_steps(outcome["steps"], include_page_states)
+            results.append(BatchTaskResult(
+                status=self._status(outcome["steps"]),
+                app=app,
+                instruction=instruction,
+                steps=normalized_steps,
+                duration_ms=round(outcome["duration_ms"], 1),
+                page_states=page_states
+            ))
+
+        return BatchTaskResponse(
+            status="failed" if any(result.status == "failed" for result in results) else "completed",
+            app=app,
+            results=results,
+            timing=BatchTiming(
+                planning_ms=round((planned - started) * 1000, 1),
+                execution_ms=round((finished - planned) * 1000, 1),
+                total_ms=round((finished - started) * 1000, 1)
+            )
         )
+
+    async def _within_deadline(self, work, deadline: Deadline, on_timeout: Callable) -> List[Dict[str, Any]]:
+        """Hard stop for work that overruns its budget despite the shrinking per-operation timeouts.
+
+        ``on_timeout`` receives the deadline error step and builds the result from
+        whatever the cancelled work had captured so far.
+        """
+        try:
+            return await asyncio.wait_for(work, timeout=deadline.remaining() + settings.DEADLINE_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning("Task exceeded its %ss deadline and was cancelled", deadline.seconds)
+            return on_timeout({
+                "action": "error",
+                "selector_hint": "deadline",
+                "description": f"Task deadline of {deadline.seconds:g}s exceeded",
+                "screenshot_path": None,
+                "error": "Task deadline exceeded"
+            })
+
+    def _timed_out_batch(
+        self, instructions: List[str], partial: List[Dict[str, Any]], error_step: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Keep finished instructions, end the running one with the deadline error and fail the rest"""
+        outcomes = []
+        for index in range(len(instructions)):
+            if index >= len(partial):
+                outcomes.append({"steps": [error_step], "duration_ms": 0.0})
+            elif partial[index]["duration_ms"] is None:
+                outcomes.append({
+                    "steps": partial[index]["steps"] + [error_step],
+                    "duration_ms": (time.perf_counter() - partial[index]["started"]) * 1000
+                })
+            else:
+                outcomes.append(partial[index])
+        return outcomes
+
+    def _normalize_steps(self, steps: List[Dict[str, Any]], include_page_states: bool = False):
+        """Build response steps; page states are only collected, each distinct one once, when asked for"""
+        if not include_page_states:
+            return [Step(**s) for s in steps], None
+        slim_steps, page_states = dedupe_page_states(steps)
+        return [Step(**s) for s in slim_steps], page_states or None
+
+    def _has_unrecovered_error(self, steps: List[Dict[str, Any]]) -> bool:
+        return any(s.get("error") and not s.get("recovered") for s in steps)
+
+    def _status(self, steps: List[Dict[str, Any]]) -> str:
+        return "failed" if self._has_unrecovered_error(steps) else "completed"
 task_service = TaskService()
\ No newline at end of file
@@ -1,16 +1,76 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     APP_NAME: str = "Softlight Agent"
     ENV: str = "development"
-    GROQ_API_KEY: str
-    MODEL_NAME: str
+    # Only needed once the planner calls the LLM; the Groq client is built lazily.
+    GROQ_API_KEY: Optional[str] = None
+    MODEL_NAME: Optional[str] = None
 
     PLAYWRIGHT_USER_DATA_DIR: Optional[str] = None
 
     PLAYWRIGHT_STORAGE_STATE: Optional[str] = None
+    PLAYWRIGHT_HEADLESS: bool = False
+    PLAYWRIGHT_VIEWPORT_WIDTH: int = 1280
+    PLAYWRIGHT_VIEWPORT_HEIGHT: int = 720
+    PLAYWRIGHT_DEVICE_SCALE_FACTOR: float = 1.0
+
+    BLOCKED_RESOURCE_TYPES: List[str] = ["media"]
+    BLOCK_TRACKERS: bool = True
+    RESOURCE_ALLOW_LIST: List[str] = []
+
+    ASSET_CACHE_ENABLED: bool = True
+    ASSET_CACHE_DIR: str = "./asset_cache"
+    ASSET_CACHE_MAX_MB: int = 512
+
+    INPUT_MODE: str = "auto"
+    TYPING_DELAY_MS: int = 50
+
+    ROLE_CLASSIFIER_CACHE_SIZE: int = 4096
+
+    CAPTURE_MODE: str = "screenshot"
+    SCREENCAST_MAX_FPS: float = 5.0
+    SCREENCAST_QUALITY: int = 60
+
+    NOTION_URL: str = "https://www.notion.so/"
+    DATASET_DIR: str = "app/dataset"
+    MACRO_DIR: str = "app/macros"
+
+    LLM_REQUESTS_PER_MINUTE: int = 30
+    LLM_BURST: int = 5
+    PLAN_CACHE_SIZE: int = 128
+    PLAN_CACHE_TTL_SECONDS: float = 600.0
+    BATCH_MAX_INSTRUCTIONS: int = 50
+    MAX_REPLANS: int = 2
+
+    TASK_DEADLINE_SECONDS: float = 300.0
+    BATCH_DEADLINE_SECONDS: float = 1800.0
+    DEADLINE_GRACE_SECONDS: float = 5.0
+
+    ADAPTIVE_TIMEOUTS_ENABLED: bool = True
+    ADAPTIVE_TIMEOUT_STATS_PATH: str = "./timeout_stats.json"
+    ADAPTIVE_TIMEOUT_PERCENTILE: float = 0.99
+    ADAPTIVE_TIMEOUT_MARGIN: float = 1.5
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES: int = 20
+    ADAPTIVE_TIMEOUT_FLOOR_MS: float = 1000.0
+    ADAPTIVE_TIMEOUT_CEILING_MS: float = 60000.0
+
+    RESPONSE_GZIP: bool = True
+    RESPONSE_GZIP_MIN_BYTES: int = 1024
+
+    JOB_QUEUE_PATH: str = "./jobs.sqlite3"
+    WORKSPACE_PROFILES_DIR: str = "./playwright_profiles"
+    WORKER_CAPACITY: int = 2
+    WORKER_HEARTBEAT_SECONDS: float = 5.0
+    WORKER_TIMEOUT_SECONDS: float = 30.0
+    WORKER_POLL_SECONDS: float = 1.0
+    AFFINITY_WAIT_SECONDS: float = 30.0
+    JOB_MAX_ATTEMPTS: int = 3
+
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,90 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Optional, TypeVar
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a task has used up its time budget."""
+
+
+class Deadline:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout_ms(self, default_ms: float) -> float:
+        """Shrink an operation timeout to what is left of the budget"""
+        remaining_ms = self.remaining() * 1000
+        if remaining_ms <= 0:
+            raise DeadlineExceeded(f"Task deadline of {self.seconds:g}s exceeded")
+        return min(default_ms, remaining_ms)
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+
+def set_deadline(seconds: float) -> Deadline:
+    """Start a budget for the current task; tasks spawned afterwards inherit it."""
+    deadline = Deadline(seconds)
+    _current_deadline.set(deadline)
+    return deadline
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+def budget_ms(default_ms: float) -> float:
+    deadline = _current_deadline.get()
+    return deadline.timeout_ms(default_ms) if deadline else default_ms
+
+
+def budget_seconds(default_seconds: float) -> float:
+    return budget_ms(default_seconds * 1000) / 1000
+
+
+def check_deadline():
+    deadline = _current_deadline.get()
+    if deadline and deadline.expired:
+        raise DeadlineExceeded(f"Task deadline of {deadline.seconds:g}s exceeded")
+
+
+class ClientDisconnected(Exception):
+    """Raised when the HTTP client went away and its task was cancelled."""
+
+
+async def cancel_on_disconnect(request, work: Awaitable[T], poll_interval: float = 0.5) -> T:
+    """Run ``work`` and cancel it as soon as the HTTP client disconnects.
+
+    Cancellation unwinds the task's ``finally`` blocks, which close its browser context.
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                logger.warning("Client disconnected, cancelling task")
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
@@ -1,12 +1,27 @@
-from groq import Groq
 from app.utils.config import settings
 
 class GroqClient:
+    """Builds the Groq SDK client on first use, so importing the app needs neither
+    the SDK nor credentials until an LLM call is actually made."""
+
     def __init__(self):
-        if not settings.GROQ_API_KEY:
-            raise RuntimeError("GROQ_API_KEY is not set in environment (.env)")
-        self.client = Groq(api_key=settings.GROQ_API_KEY)
-        self.chat = self.client.chat
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            if not settings.GROQ_API_KEY:
+                raise RuntimeError("GROQ_API_KEY is not set in environment (.env)")
+            if not settings.MODEL_NAME:
+                raise RuntimeError("MODEL_NAME is not set in environment (.env)")
+            from groq import Groq
+
+            self._client = Groq(api_key=settings.GROQ_API_KEY)
+        return self._client
+
+    @property
+    def chat(self):
+        return self.client.chat
 
     def __getattr__(self, name: str):
         """Forward unknown attributes to the underlying Groq client."""
@@ -0,0 +1,76 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+task_id_var: ContextVar[str] = ContextVar("task_id", default="-")
+
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "task_id"}
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class TaskContextFilter(logging.Filter):
+    """Stamps each record with the correlation id of the task that emitted it."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.task_id = task_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "task_id": getattr(record, "task_id", "-"),
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+TEXT_FORMAT = "%(asctime)s %(levelname)-7s [%(task_id)s] %(name)s: %(message)s"
+
+
+def setup_logging(level: str = "INFO", fmt: str = "json"):
+    """Route the ``app`` loggers through a queue so emitting never blocks on stdout."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(TaskContextFilter())
+
+    logger = logging.getLogger("app")
+    logger.setLevel(level.upper())
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(name)
+
+
+def new_task_id() -> str:
+    task_id = uuid.uuid4().hex[:12]
+    task_id_var.set(task_id)
+    return task_id
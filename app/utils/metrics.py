@@ -0,0 +1,144 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 180.0)
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    body = ",".join(f'{key}="{str(value).replace(chr(34), chr(39))}"' for key, value in pairs)
+    return "{" + body + "}"
+
+
+class Counter:
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value:g}")
+        return "\n".join(lines)
+
+
+class Histogram:
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [bucket counts..., sum, count]
+        self._values: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_format_labels(key, (('le', f'{bound:g}'),))} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, (('le', '+Inf'),))} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series[-2]:.6f}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+        return "\n".join(lines)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, description: str) -> Counter:
+        metric = Counter(name, description)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, description: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, description, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+registry = MetricsRegistry()
+
+PHASE_SECONDS = registry.histogram("softlight_phase_seconds", "Time spent in each task phase.")
+STRATEGY_SECONDS = registry.histogram(
+    "softlight_strategy_seconds", "Time spent per element strategy attempt."
+)
+STRATEGY_ATTEMPTS = registry.counter(
+    "softlight_strategy_attempts_total", "Element strategy attempts by action, strategy type and outcome."
+)
+PLAN_CACHE = registry.counter("softlight_plan_cache_total", "Plan cache lookups by outcome.")
+SPECULATIVE_PLANS = registry.counter(
+    "softlight_speculative_plans_total", "Speculative plans that were used or replaced by a re-plan."
+)
+REPLANS = registry.counter("softlight_replans_total", "In-session re-plans after a failed step, by outcome.")
+LLM_TOKENS = registry.counter("softlight_llm_tokens_total", "LLM tokens used, by kind.")
+LLM_PARSES = registry.counter("softlight_llm_parses_total", "Planner output parses, by outcome.")
+TASKS = registry.counter("softlight_tasks_total", "Finished tasks by kind and status.")
+
+_task_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("task_timings", default=None)
+
+
+def start_task_timings() -> Dict[str, float]:
+    """Collect span durations for the current task; tasks spawned afterwards share the dict."""
+    timings: Dict[str, float] = {}
+    _task_timings.set(timings)
+    return timings
+
+
+@contextmanager
+def span(phase: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        PHASE_SECONDS.observe(elapsed, phase=phase)
+        timings = _task_timings.get()
+        if timings is not None:
+            timings[phase] = timings.get(phase, 0.0) + elapsed * 1000
+
+
+@contextmanager
+def strategy_span(action: str, strategy: str):
+    """Time one strategy attempt; leaving the block by exception counts as a miss."""
+    started = time.perf_counter()
+    outcome = "miss"
+    try:
+        yield
+        outcome = "hit"
+    finally:
+        elapsed = time.perf_counter() - started
+        STRATEGY_SECONDS.observe(elapsed, action=action, strategy=strategy)
+        STRATEGY_ATTEMPTS.inc(action=action, strategy=strategy, outcome=outcome)
+        timings = _task_timings.get()
+        if timings is not None:
+            timings["strategy_attempts"] = timings.get("strategy_attempts", 0.0) + elapsed * 1000
@@ -0,0 +1,37 @@
+import time
+from collections import OrderedDict
+from typing import Hashable, List, Optional
+
+
+class PlanCache:
+    """LRU cache of generated plans whose entries expire after ``ttl_seconds``."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[List[dict]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, steps = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return [dict(step) for step in steps]
+
+    def put(self, key: Hashable, steps: List[dict]):
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, [dict(step) for step in steps])
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,136 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple, Union
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from app.models.task_models import Step
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:  # listed in requirements.txt; fall back to the standard encoder without it
+    orjson = None
+    FastJSONResponse = JSONResponse
+
+PAGE_STATE_MODES = ("none", "ref", "delta")
+
+
+def _dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS, default=str)
+    return json.dumps(value, sort_keys=True, default=str).encode()
+
+
+def dedupe_page_states(steps: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Move each step's ``page_state`` into a shared table and leave a ``page_state_id`` behind.
+
+    Consecutive steps that leave the page unchanged then share one entry instead of
+    each carrying the whole interactive-element list.
+    """
+    page_states = {}
+    slim_steps = []
+    for step in steps:
+        state = step.get("page_state")
+        if not state:
+            slim_steps.append(step)
+            continue
+        state_id = hashlib.sha1(_dumps(state)).hexdigest()[:12]
+        page_states.setdefault(state_id, state)
+        slim_steps.append({**{k: v for k, v in step.items() if k != "page_state"}, "page_state_id": state_id})
+    return slim_steps, page_states
+
+
+def _list_delta(before: List[Any], after: List[Any]) -> Dict[str, List[Any]]:
+    before_keys = {_dumps(item) for item in before}
+    after_keys = {_dumps(item) for item in after}
+    return {
+        "added": [item for item in after if _dumps(item) not in before_keys],
+        "removed": [item for item in before if _dumps(item) not in after_keys],
+    }
+
+
+def _state_delta(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    delta = {}
+    for key, value in after.items():
+        previous = before.get(key)
+        if previous == value:
+            continue
+        if isinstance(value, list) and isinstance(previous, list):
+            delta[key] = _list_delta(previous, value)
+        else:
+            delta[key] = value
+    return delta
+
+
+def _as_deltas(steps: List[Dict[str, Any]], page_states: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Keep the first state in step order whole and express each later one against its predecessor"""
+    shaped = {}
+    previous_id = None
+    for step in steps:
+        state_id = step.get("page_state_id")
+        if not state_id or state_id in shaped:
+            continue
+        if previous_id is None:
+            shaped[state_id] = page_states[state_id]
+        else:
+            shaped[state_id] = {
+                "base": previous_id,
+                "delta": _state_delta(page_states[previous_id], page_states[state_id]),
+            }
+        previous_id = state_id
+    return shaped
+
+
+def _shape_task(
+    task: Dict[str, Any], fields: Optional[List[str]], page_states: str
+) -> Dict[str, Any]:
+    steps = task.get("steps") or []
+    if page_states == "none":
+        task.pop("page_states", None)
+        steps = [{k: v for k, v in step.items() if k != "page_state_id"} for step in steps]
+    elif page_states == "delta" and task.get("page_states"):
+        task["page_states"] = _as_deltas(steps, task["page_states"])
+
+    if fields:
+        keep = set(fields)
+        if page_states != "none":
+            keep.add("page_state_id")
+        steps = [{k: v for k, v in step.items() if k in keep} for step in steps]
+    task["steps"] = steps
+    return task
+
+
+def parse_shaping(fields: Optional[str], page_states: str) -> Optional[List[str]]:
+    """Validate the shaping query parameters before any work starts; returns the selected step fields"""
+    if page_states not in PAGE_STATE_MODES:
+        raise HTTPException(status_code=400, detail=f"page_states must be one of: {', '.join(PAGE_STATE_MODES)}.")
+    if not fields:
+        return None
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(selected) - set(Step.model_fields))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown step fields: {', '.join(unknown)}.")
+    return selected
+
+
+def shaped_response(
+    model: BaseModel, fields: Optional[List[str]] = None, page_states: str = "none"
+) -> Union[BaseModel, JSONResponse]:
+    """Serialize a task or batch response, trimmed to the requested step fields and page-state form.
+
+    ``page_states`` is ``none`` (omitted), ``ref`` (one copy per distinct state, referenced
+    from steps by ``page_state_id``) or ``delta`` (like ``ref``, but each state after the
+    first is stored as its changes against the previous one).
+
+    Without any shaping the model itself is returned, so FastAPI validates it against the
+    route's ``response_model``; shaped bodies no longer match that schema and are sent as is.
+    """
+    if not fields and page_states == "none":
+        return model
+    body = model.model_dump()
+    if "results" in body:
+        body["results"] = [_shape_task(result, fields, page_states) for result in body["results"]]
+    else:
+        body = _shape_task(body, fields, page_states)
+    return FastJSONResponse(body)
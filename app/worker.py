@@ -0,0 +1,141 @@
+"""Worker process that runs queued tasks from the shared job queue.
+
+    python -m app.worker                 # capacity from WORKER_CAPACITY
+    python -m app.worker --capacity 4 --worker-id node-a
+
+Start one per machine (or several, each with their own profiles directory);
+API servers enqueue through ``POST /jobs`` against the same ``JOB_QUEUE_PATH``.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+from typing import Dict, List, Optional, Set
+from app.services.capture_service import capture_service
+from app.services.job_queue import job_queue
+from app.services.task_service import task_service
+from app.utils.config import settings
+from app.utils.log import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+
+class Worker:
+    """Claims jobs up to ``capacity`` at a time and heartbeats what it can take next.
+
+    A workspace counts as warm here when a previous run on this machine reached the
+    logged-in workspace with its local browser profile. No browser is kept open
+    between jobs: every job still launches its own persistent context, and affinity
+    only saves the login a cold profile would need.
+    """
+
+    def __init__(self, worker_id: str, capacity: int):
+        self.worker_id = worker_id
+        self.capacity = capacity
+        self._running: Dict[asyncio.Task, Optional[str]] = {}
+        self._stopping = asyncio.Event()
+
+    def warm_workspaces(self) -> List[str]:
+        try:
+            return sorted(
+                name for name in os.listdir(settings.WORKSPACE_PROFILES_DIR)
+                if job_queue.is_valid_workspace(name)
+                and capture_service.is_logged_in(name)
+            )
+        except OSError:
+            return []
+
+    def busy_workspaces(self) -> Set[Optional[str]]:
+        return set(self._running.values())
+
+    def stop(self):
+        logger.info("Worker %s stopping after %s running jobs", self.worker_id, len(self._running))
+        self._stopping.set()
+
+    async def run(self):
+        logger.info("Worker %s started with capacity %s", self.worker_id, self.capacity)
+        # Register before claiming, so no other worker treats our first job as orphaned.
+        await self._heartbeat()
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        try:
+            while not self._stopping.is_set():
+                job = None
+                if len(self._running) < self.capacity:
+                    job = await asyncio.to_thread(
+                        job_queue.claim, self.worker_id, self.warm_workspaces(), self.busy_workspaces()
+                    )
+                if job is None:
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), timeout=settings.WORKER_POLL_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                task = asyncio.create_task(self._run_job(job))
+                self._running[task] = job["workspace"]
+                task.add_done_callback(self._running.pop)
+
+            if self._running:
+                await asyncio.wait(list(self._running))
+        finally:
+            heartbeat.cancel()
+            await asyncio.to_thread(job_queue.deregister, self.worker_id)
+            logger.info("Worker %s stopped", self.worker_id)
+
+    async def _run_job(self, job):
+        logger.info("Running job %s: %s", job["id"], job["instruction"])
+        try:
+            result = await task_service.process_task(
+                job["app"],
+                job["instruction"],
+                job["record_macro"],
+                include_timings=True,
+                deadline_seconds=job["deadline_seconds"],
+                workspace=job["workspace"],
+            )
+            if result.status == "failed":
+                last_step = result.steps[-1].description if result.steps else "no steps ran"
+                await asyncio.to_thread(
+                    job_queue.fail, job["id"], self.worker_id, f"Task failed: {last_step}", result.model_dump()
+                )
+            else:
+                await asyncio.to_thread(job_queue.complete, job["id"], self.worker_id, result.model_dump())
+        except Exception as e:
+            logger.error("Job %s failed: %s", job["id"], e)
+            await asyncio.to_thread(job_queue.fail, job["id"], self.worker_id, str(e))
+
+    async def _heartbeat(self):
+        await asyncio.to_thread(
+            job_queue.heartbeat, self.worker_id, self.capacity, len(self._running), self.warm_workspaces()
+        )
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(settings.WORKER_HEARTBEAT_SECONDS)
+            try:
+                await self._heartbeat()
+                await asyncio.to_thread(job_queue.requeue_stale)
+            except Exception as e:
+                logger.warning("Heartbeat failed: %s", e)
+
+
+async def serve(worker: Worker):
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    await worker.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}")
+    parser.add_argument("--capacity", type=int, default=settings.WORKER_CAPACITY)
+    args = parser.parse_args()
+
+    setup_logging(settings.LOG_LEVEL, settings.LOG_FORMAT)
+    asyncio.run(serve(Worker(args.worker_id, args.capacity)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Offline evaluation of the planner over an instruction corpus.
+
+Runs every case in ``fixtures/planner_corpus.json`` through ``LLMAgent`` the way
+a task does: a context-free plan first, kept when it fits the page (the fast
+path) and re-planned with page context otherwise. Cases run concurrently, and
+``--passes`` repeats the corpus so later passes exercise the plan cache.
+
+Per case it reports latency, LLM calls, tokens, parse outcomes, cache and
+fast-path use, and step-level accuracy against the expected steps.
+
+    python -m benchmarks.eval_planner --concurrency 8 --passes 2
+    python -m benchmarks.eval_planner --malformed-every 5           # inject unparseable output
+    python -m benchmarks.eval_planner --backend recorded --recordings planner.jsonl
+    python -m benchmarks.eval_planner --backend live --record planner.jsonl   # needs GROQ_API_KEY
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fake_llm import FakeGroqClient, RecordedGroqClient
+from benchmarks.run_benchmarks import percentile
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "planner_corpus.json")
+
+
+def normalize_hint(hint: Optional[str]) -> str:
+    return re.sub(r"\s+", " ", re.sub(r"\(.*?\)", "", hint or "")).strip().lower()
+
+
+def step_matches(expected: Dict[str, Any], actual: Dict[str, Any]) -> bool:
+    """Same action, same target ignoring parenthesised notes and case, and same value when one is expected"""
+    if expected.get("action") != actual.get("action"):
+        return False
+    if normalize_hint(expected.get("selector_hint")) != normalize_hint(actual.get("selector_hint")):
+        return False
+    return "value" not in expected or (expected["value"] or "") == (actual.get("value") or "")
+
+
+def step_accuracy(expected: List[Dict[str, Any]], actual: List[Dict[str, Any]]) -> float:
+    """Position-wise matches over the longer of the two plans, so extra and missing steps both count"""
+    longest = max(len(expected), len(actual))
+    if not longest:
+        return 1.0
+    return sum(step_matches(e, a) for e, a in zip(expected, actual)) / longest
+
+
+def page_context(labels: List[str]) -> Dict[str, Any]:
+    return {
+        "url": "https://www.notion.so/bench-workspace",
+        "title": "Bench Workspace",
+        "interactive_elements": [{"text": label, "aria_label": "", "data_testid": ""} for label in labels],
+    }
+
+
+def configure_environment():
+    os.environ.update({
+        "GROQ_API_KEY": os.environ.get("GROQ_API_KEY") or "offline-eval",
+        "MODEL_NAME": os.environ.get("MODEL_NAME") or "fake-model",
+        "LLM_REQUESTS_PER_MINUTE": os.environ.get("LLM_REQUESTS_PER_MINUTE", "60000"),
+        "LLM_BURST": os.environ.get("LLM_BURST", "1000"),
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "ERROR"),
+    })
+
+
+def install_backend(args):
+    from app.services.llm_agent import llm_agent
+
+    if args.backend == "fake":
+        client = FakeGroqClient(latency=args.llm_latency, malformed_every=args.malformed_every)
+    elif args.backend == "recorded":
+        client = RecordedGroqClient(args.recordings)
+    else:
+        from app.utils.groq_client import groq_client
+
+        client = RecordedGroqClient(args.record, upstream=groq_client) if args.record else groq_client
+    llm_agent.client = client
+    return client
+
+
+async def evaluate_case(case: Dict[str, Any], contexts: Dict[str, Dict[str, Any]], run: int) -> Dict[str, Any]:
+    from app.services.capture_service import capture_service
+    from app.services.llm_agent import llm_agent, start_plan_trace
+
+    trace = start_plan_trace()
+    context = contexts.get(case.get("page"))
+    started = time.perf_counter()
+    error = None
+    fast_path = None
+    try:
+        steps = await llm_agent.analyze_page_and_generate_steps("Notion", case["instruction"])
+        if context is not None:
+            fast_path = capture_service._plan_fits_page(steps, context)
+            if not fast_path:
+                steps = await llm_agent.analyze_page_and_generate_steps("Notion", case["instruction"], context)
+    except Exception as e:
+        steps = []
+        error = str(e)
+    latency_ms = (time.perf_counter() - started) * 1000
+
+    expected = case["expected"]
+    return {
+        "run": run,
+        "instruction": case["instruction"],
+        "latency_ms": round(latency_ms, 1),
+        "llm_calls": trace["llm_calls"],
+        "prompt_tokens": trace["prompt_tokens"],
+        "completion_tokens": trace["completion_tokens"],
+        "parses": trace["parses"],
+        "cache": trace["cache"],
+        "fast_path": fast_path,
+        "steps": len(steps),
+        "step_accuracy": round(step_accuracy(expected, steps), 3),
+        "exact": len(expected) == len(steps) and all(map(step_matches, expected, steps)),
+        "error": error,
+    }
+
+
+async def run(args) -> Dict[str, Any]:
+    with open(args.corpus, encoding="utf-8") as f:
+        corpus = json.load(f)
+    contexts = {name: page_context(labels) for name, labels in corpus.get("page_labels", {}).items()}
+    cases = corpus["cases"][:args.limit] if args.limit else corpus["cases"]
+
+    from app.utils.config import settings
+    from app.utils.log import setup_logging
+
+    setup_logging(settings.LOG_LEVEL, "text")
+    client = install_backend(args)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(case, run_index):
+        async with semaphore:
+            return await evaluate_case(case, contexts, run_index)
+
+    rows = []
+    for run_index in range(1, args.passes + 1):
+        # Passes run one after another so that a later pass can hit the plan cache.
+        rows.extend(await asyncio.gather(*(bounded(case, run_index) for case in cases)))
+
+    if isinstance(client, RecordedGroqClient) and client.upstream is not None:
+        client.save()
+    return {"rows": rows, "summary": summarize(rows)}
+
+
+def summarize(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    parses = [outcome for row in rows for outcome in row["parses"]]
+    lookups = [outcome for row in rows for outcome in row["cache"]]
+    fast_paths = [row["fast_path"] for row in rows if row["fast_path"] is not None]
+    latencies = [row["latency_ms"] for row in rows]
+    return {
+        "cases": len(rows),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "llm_calls": sum(row["llm_calls"] for row in rows),
+        "prompt_tokens": sum(row["prompt_tokens"] for row in rows),
+        "completion_tokens": sum(row["completion_tokens"] for row in rows),
+        "parse_failures": sum(outcome != "ok" for outcome in parses),
+        "parse_failure_rate": round(sum(outcome != "ok" for outcome in parses) / len(parses), 3) if parses else 0.0,
+        "cache_hit_rate": round(lookups.count("hit") / len(lookups), 3) if lookups else 0.0,
+        "fast_path_rate": round(sum(fast_paths) / len(fast_paths), 3) if fast_paths else 0.0,
+        "step_accuracy": round(sum(row["step_accuracy"] for row in rows) / len(rows), 3) if rows else 0.0,
+        "exact_match_rate": round(sum(row["exact"] for row in rows) / len(rows), 3) if rows else 0.0,
+        "errors": sum(1 for row in rows if row["error"]),
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"{'run':>3}  {'instruction'.ljust(44)}{'ms':>8}{'calls':>6}{'tokens':>8}  {'parse':<22}{'cache':<10}{'fast':<6}{'acc':>6}")
+    for row in report["rows"]:
+        tokens = row["prompt_tokens"] + row["completion_tokens"]
+        parse = ",".join(row["parses"]) or "-"
+        cache = ",".join(row["cache"]) or "-"
+        fast = "-" if row["fast_path"] is None else ("yes" if row["fast_path"] else "no")
+        print(
+            f"{row['run']:>3}  {row['instruction'][:42].ljust(44)}{row['latency_ms']:>8.1f}{row['llm_calls']:>6}"
+            f"{tokens:>8}  {parse[:21]:<22}{cache[:9]:<10}{fast:<6}{row['step_accuracy']:>6.2f}"
+        )
+    print()
+    for name, value in report["summary"].items():
+        print(f"{name.ljust(20)}{value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--backend", choices=("fake", "recorded", "live"), default="fake")
+    parser.add_argument("--recordings", help="JSONL file to replay with --backend recorded")
+    parser.add_argument("--record", help="With --backend live, save completions to this JSONL file")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--passes", type=int, default=2, help="Times to run the corpus; later passes hit the cache")
+    parser.add_argument("--limit", type=int, default=0, help="Only evaluate the first N cases")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Simulated LLM latency in seconds")
+    parser.add_argument("--malformed-every", type=int, default=0, help="Fake backend: break every n-th completion")
+    parser.add_argument("--json", help="Write the rows and summary to this file")
+    args = parser.parse_args()
+    if args.backend == "recorded" and not args.recordings:
+        parser.error("--backend recorded needs --recordings")
+
+    if args.backend != "live":
+        configure_environment()
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Deterministic and recorded stand-ins for the Groq client used by LLMAgent."""
+import json
+import re
+import time
+from types import SimpleNamespace
+from typing import Dict, Tuple
+
+DATABASE_STEPS = [
+    {"action": "click", "selector_hint": "More Options (v shaped button)", "description": "Open main creation menu", "value": None, "url": None},
+    {"action": "click", "selector_hint": "Database", "description": "Create new database", "value": None, "url": None},
+    {"action": "fill", "selector_hint": "Untitled", "description": "Name the database", "value": "{name}", "url": None},
+]
+
+SEARCH_STEPS = [
+    {"action": "click", "selector_hint": "Search", "description": "Open search field", "value": None, "url": None},
+    {"action": "fill", "selector_hint": "Search", "description": "Enter search query", "value": "{name}", "url": None},
+]
+
+THEME_STEPS = [
+    {"action": "click", "selector_hint": "Settings & members", "description": "Open settings", "value": None, "url": None},
+    {"action": "click", "selector_hint": "Appearance", "description": "Open appearance settings", "value": None, "url": None},
+    {"action": "click", "selector_hint": "Dark mode", "description": "Switch to dark mode", "value": None, "url": None},
+]
+
+PAGE_STEPS = [
+    {"action": "click", "selector_hint": "More Options (v shaped button)", "description": "Open main creation menu", "value": None, "url": None},
+    {"action": "click", "selector_hint": "Page", "description": "Create new page", "value": None, "url": None},
+    {"action": "fill", "selector_hint": "Untitled", "description": "Name the page", "value": "{name}", "url": None},
+]
+
+INSTRUCTION_PATTERN = re.compile(r"instruction:\s*(.+)", re.IGNORECASE)
+QUOTED_PATTERN = re.compile(r"['\"]([^'\"]+)['\"]")
+NAMED_PATTERN = re.compile(r"(?:named|called|for)\s+(\S+)", re.IGNORECASE)
+
+
+def plan_for(instruction: str) -> list:
+    text = instruction.lower()
+    if "database" in text:
+        steps = DATABASE_STEPS
+    elif "search" in text or "find" in text:
+        steps = SEARCH_STEPS
+    elif any(word in text for word in ("theme", "dark", "light", "appearance")):
+        steps = THEME_STEPS
+    else:
+        steps = PAGE_STEPS
+
+    match = QUOTED_PATTERN.search(instruction) or NAMED_PATTERN.search(instruction)
+    name = match.group(1) if match else "Softlight Bench"
+    return [{**step, "value": step["value"].format(name=name) if step["value"] else None} for step in steps]
+
+
+class _Completions:
+    def __init__(self, owner: "FakeGroqClient"):
+        self._owner = owner
+
+    def create(self, model=None, messages=None, **kwargs):
+        prompt = messages[-1]["content"] if messages else ""
+        match = INSTRUCTION_PATTERN.search(prompt)
+        instruction = match.group(1).strip() if match else ""
+
+        if self._owner.latency:
+            # Blocking on purpose: the real Groq client is synchronous too.
+            time.sleep(self._owner.latency)
+        self._owner.calls += 1
+
+        content = json.dumps(plan_for(instruction), indent=2)
+        if self._owner.malformed_every and self._owner.calls % self._owner.malformed_every == 0:
+            # What models do now and then: chatter around the plan and an unterminated array.
+            content = "Here are the steps:\n" + content[:len(content) // 2]
+        return _response(content, len(prompt) // 4, len(content) // 4)
+
+
+def _response(content: str, prompt_tokens: int, completion_tokens: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+    )
+
+
+class FakeGroqClient:
+    """Mimics the parts of ``groq_client`` that LLMAgent touches.
+
+    ``malformed_every`` makes every n-th completion unparseable, to exercise the
+    planner's parse-failure path.
+    """
+
+    def __init__(self, latency: float = 0.0, malformed_every: int = 0):
+        self.latency = latency
+        self.malformed_every = malformed_every
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=_Completions(self))
+
+
+def recording_key(prompt: str) -> Tuple[str, bool]:
+    """Recordings are keyed by instruction and whether the prompt carried page context"""
+    match = INSTRUCTION_PATTERN.search(prompt)
+    return (match.group(1).strip() if match else "", "CURRENT PAGE:" in prompt)
+
+
+class _RecordedCompletions:
+    def __init__(self, owner: "RecordedGroqClient"):
+        self._owner = owner
+
+    def create(self, model=None, messages=None, **kwargs):
+        prompt = messages[-1]["content"] if messages else ""
+        key = recording_key(prompt)
+        owner = self._owner
+        if owner.upstream is not None:
+            response = owner.upstream.chat.completions.create(model=model, messages=messages, **kwargs)
+            usage = getattr(response, "usage", None)
+            owner.recordings[key] = {
+                "instruction": key[0],
+                "with_context": key[1],
+                "content": response.choices[0].message.content,
+                "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+                "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+            }
+            return response
+
+        recording = owner.recordings.get(key)
+        if recording is None:
+            raise KeyError(f"No recording for {key[0]!r} (with_context={key[1]})")
+        owner.calls += 1
+        return _response(recording["content"], recording["prompt_tokens"], recording["completion_tokens"])
+
+
+class RecordedGroqClient:
+    """Replays completions saved in a JSONL file, or records them when given an ``upstream`` client."""
+
+    def __init__(self, path: str, upstream=None):
+        self.path = path
+        self.upstream = upstream
+        self.calls = 0
+        self.recordings: Dict[Tuple[str, bool], dict] = {}
+        if upstream is None:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        recording = json.loads(line)
+                        self.recordings[(recording["instruction"], recording["with_context"])] = recording
+        self.chat = SimpleNamespace(completions=_RecordedCompletions(self))
+
+    def save(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            for recording in self.recordings.values():
+                f.write(json.dumps(recording) + "\n")
@@ -0,0 +1,87 @@
+"""Cold import-time benchmark for the service entry point.
+
+Imports ``app.main`` in fresh interpreters, the way every uvicorn worker does
+on spawn, and reports p50/p95 wall time. With ``--breakdown`` it also lists
+the slowest modules reported by ``python -X importtime``.
+
+    python -m benchmarks.import_time --runs 10 --breakdown 15
+
+Credentials are removed from the environment, so the run also checks that
+the app can be imported without them.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+from benchmarks.run_benchmarks import percentile
+
+MEASURE = (
+    "import time; started = time.perf_counter(); import {module}; "
+    "print((time.perf_counter() - started) * 1000)"
+)
+
+
+def clean_environment() -> Dict[str, str]:
+    env = dict(os.environ)
+    for name in ("GROQ_API_KEY", "MODEL_NAME"):
+        env.pop(name, None)
+    env["LOG_LEVEL"] = "WARNING"
+    return env
+
+
+def time_import(module: str, env: Dict[str, str]) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE.format(module=module)],
+        env=env, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_modules(module: str, env: Dict[str, str], limit: int) -> List[Tuple[str, int]]:
+    """Cumulative microseconds per module from ``-X importtime``"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(cumulative)))
+    return sorted(rows, key=lambda row: row[1], reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--breakdown", type=int, default=0, help="Show this many of the slowest modules")
+    parser.add_argument("--json", help="Write the summary to this file")
+    args = parser.parse_args()
+
+    env = clean_environment()
+    samples = [time_import(args.module, env) for _ in range(args.runs)]
+    summary = {
+        "module": args.module,
+        "n": len(samples),
+        "p50_ms": round(percentile(samples, 50), 1),
+        "p95_ms": round(percentile(samples, 95), 1),
+    }
+    print(f"import {args.module}: p50 {summary['p50_ms']:.1f} ms, p95 {summary['p95_ms']:.1f} ms over {args.runs} runs")
+
+    if args.breakdown:
+        print(f"\n{'module'.ljust(48)}{'cumulative ms':>14}")
+        for name, micros in slowest_modules(args.module, env, args.breakdown):
+            print(f"{name[:46].ljust(48)}{micros / 1000:>14.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Load-test driver for the FastAPI service.
+
+Sweeps concurrency levels against ``/tasks/run`` backed by the local Notion
+stand-in and the fake LLM, and reports throughput, p50/p99 latency, error
+rate and event-loop lag.
+
+    python -m benchmarks.load_test --levels 1,2,4,8 --requests 16
+    python -m benchmarks.load_test --base-url http://127.0.0.1:8000   # drive a running server
+
+In-process mode measures the lag of the event loop the app itself runs on,
+which is where a blocking LLM call or browser launch shows up.
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.notion_stub import NotionStubServer
+from benchmarks.run_benchmarks import SCENARIOS, configure_environment, install_fake_llm, percentile
+
+
+class LoopLagMonitor:
+    """Samples how late the event loop wakes up a task that sleeps for ``interval``."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval) * 1000)
+
+    def start(self):
+        self.samples = []
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+async def run_level(client: httpx.AsyncClient, endpoint: str, concurrency: int, total: int,
+                    timeout: float, monitor: LoopLagMonitor) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for index in range(total):
+        queue.put_nowait(SCENARIOS[index % len(SCENARIOS)])
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                instruction = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                response = await client.post(
+                    endpoint, json={"app": "Notion", "instruction": instruction}, timeout=timeout
+                )
+                # Browser or login failures still return 200, as an "error" step.
+                if response.status_code != 200 or any(
+                    step.get("action") == "error" for step in response.json().get("steps", [])
+                ):
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    await monitor.stop()
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 3),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "error_rate": round(errors / total, 3),
+        "loop_lag_p99_ms": round(percentile(monitor.samples, 99), 1),
+        "loop_lag_max_ms": round(max(monitor.samples, default=0.0), 1),
+    }
+
+
+def print_report(rows: List[Dict[str, float]]):
+    columns = ["concurrency", "requests", "throughput_rps", "p50_ms", "p99_ms",
+               "error_rate", "loop_lag_p99_ms", "loop_lag_max_ms"]
+    print("\n" + "".join(f"{c:>17}" for c in columns))
+    for row in rows:
+        print("".join(f"{row[c]:>17}" for c in columns))
+
+
+async def sweep(args, client: httpx.AsyncClient) -> List[Dict[str, float]]:
+    rows = []
+    monitor = LoopLagMonitor()
+    for level in args.levels:
+        total = max(args.requests, level)
+        print(f"concurrency {level}: {total} requests")
+        rows.append(await run_level(client, args.endpoint, level, total, args.timeout, monitor))
+    return rows
+
+
+async def run(args) -> List[Dict[str, float]]:
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url) as client:
+            return await sweep(args, client)
+
+    with NotionStubServer() as stub, tempfile.TemporaryDirectory(prefix="softlight-load-") as workdir:
+        configure_environment(stub.base_url, workdir)
+        install_fake_llm(args.llm_latency)
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        # ASGITransport does not send lifespan events, so run the startup hook here.
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://softlight.test") as client:
+                return await sweep(args, client)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,2,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=8, help="Requests per level (at least the level)")
+    parser.add_argument("--endpoint", default="/tasks/run")
+    parser.add_argument("--base-url", help="Drive a running server instead of the in-process app")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Simulated LLM latency in seconds")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-request timeout in seconds")
+    parser.add_argument("--json", help="Write the report rows to this file")
+    args = parser.parse_args()
+    args.levels = [int(level) for level in args.levels.split(",") if level.strip()]
+
+    rows = asyncio.run(run(args))
+    print_report(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Local stand-in for notion.so that serves static HTML fixtures."""
+import os
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# URL path -> fixture file. "/" is the workspace so the app's NOTION_URL can point at the root.
+ROUTES = {
+    "/": "workspace.html",
+    "/login": "login.html",
+    "/login/account-chooser": "login_account_chooser.html",
+    "/login/otp": "login_otp.html",
+}
+
+
+class _FixtureHandler(SimpleHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path in ROUTES:
+            self.path = "/" + ROUTES[path]
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class NotionStubServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        handler = partial(_FixtureHandler, directory=FIXTURES_DIR)
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, route: str = "/") -> str:
+        return self.base_url + route
+
+    def start(self) -> "NotionStubServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
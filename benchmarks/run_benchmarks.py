@@ -0,0 +1,181 @@
+"""Offline end-to-end benchmarks against the local Notion stand-in and the fake LLM.
+
+Runs ``CaptureService.execute_steps``, ``PageAnalyzer.analyze_page`` and
+``CaptureService._detect_notion_page_state`` headless and reports p50/p95 per phase.
+
+    python -m benchmarks.run_benchmarks --iterations 5 --json bench_output.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from benchmarks.fake_llm import FakeGroqClient
+from benchmarks.notion_stub import NotionStubServer
+
+SCENARIOS = [
+    'Create a database named "Bench Roadmap"',
+    'Search for "Getting Started"',
+    "Switch the workspace to dark mode",
+]
+
+STATE_VARIANTS = {
+    "workspace": "/",
+    "login": "/login",
+    "account_chooser": "/login/account-chooser",
+    "otp": "/login/otp",
+}
+
+
+def configure_environment(base_url: str, workdir: str):
+    """Point the app at the stand-in before any ``app`` module reads its settings."""
+    os.environ.update({
+        "GROQ_API_KEY": "offline-benchmark",
+        "MODEL_NAME": "fake-model",
+        "NOTION_URL": base_url + "/",
+        "PLAYWRIGHT_HEADLESS": "true",
+        "PLAYWRIGHT_USER_DATA_DIR": os.path.join(workdir, "profile"),
+        "DATASET_DIR": os.path.join(workdir, "dataset"),
+        "MACRO_DIR": os.path.join(workdir, "macros"),
+        # Caches that persist across runs start empty in the run's own directory,
+        # so cold/warm comparisons never read a developer's real cache.
+        "ASSET_CACHE_DIR": os.path.join(workdir, "asset_cache"),
+        "ADAPTIVE_TIMEOUT_STATS_PATH": os.path.join(workdir, "timeout_stats.json"),
+        "JOB_QUEUE_PATH": os.path.join(workdir, "jobs.sqlite3"),
+        "WORKSPACE_PROFILES_DIR": os.path.join(workdir, "profiles"),
+        "LLM_REQUESTS_PER_MINUTE": "60000",
+        "LLM_BURST": "1000",
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+    })
+
+
+def install_fake_llm(latency: float) -> FakeGroqClient:
+    from app.services.llm_agent import llm_agent
+
+    fake = FakeGroqClient(latency=latency)
+    llm_agent.client = fake
+    return fake
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+async def bench_execute_steps(iterations: int, warm_cache: bool) -> Dict[str, List[float]]:
+    from app.services.capture_service import capture_service
+    from app.services.llm_agent import llm_agent
+    from app.utils.metrics import start_task_timings
+
+    samples = defaultdict(list)
+    for iteration in range(iterations):
+        for instruction in SCENARIOS:
+            if not warm_cache:
+                llm_agent._plan_cache.clear()
+
+            timings = start_task_timings()
+            started = time.perf_counter()
+            steps = await capture_service.execute_steps("Notion", instruction)
+            timings["total"] = (time.perf_counter() - started) * 1000
+
+            failed = [s for s in steps if s.get("error") and not s.get("recovered")]
+            samples["errors"].append(float(len(failed)))
+            for phase, ms in timings.items():
+                samples[f"execute_steps.{phase}"].append(ms)
+            print(f"  [{iteration + 1}/{iterations}] {instruction}: {timings['total']:.0f} ms, {len(failed)} failed steps")
+    return samples
+
+
+async def bench_page_probes(stub: NotionStubServer, iterations: int) -> Dict[str, List[float]]:
+    from playwright.async_api import async_playwright
+    from app.services.capture_service import capture_service
+    from app.services.page_analyzer import page_analyzer
+
+    samples = defaultdict(list)
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        try:
+            for iteration in range(iterations):
+                await page.goto(stub.url("/"), wait_until="domcontentloaded")
+                started = time.perf_counter()
+                await page_analyzer.analyze_page(page)
+                samples["analyze_page.workspace"].append((time.perf_counter() - started) * 1000)
+
+                for variant, route in STATE_VARIANTS.items():
+                    await page.goto(stub.url(route), wait_until="domcontentloaded")
+                    started = time.perf_counter()
+                    state = await capture_service._detect_notion_page_state(page)
+                    samples[f"detect_state.{variant}"].append((time.perf_counter() - started) * 1000)
+                    if iteration == 0:
+                        print(f"  {variant}: detected '{state}'")
+        finally:
+            await browser.close()
+    return samples
+
+
+def summarize(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    return {
+        name: {
+            "n": len(values),
+            "p50_ms": round(percentile(values, 50), 1),
+            "p95_ms": round(percentile(values, 95), 1),
+        }
+        for name, values in sorted(samples.items())
+    }
+
+
+def print_report(summary: Dict[str, Dict[str, float]]):
+    width = max(len(name) for name in summary) + 2
+    print(f"\n{'phase'.ljust(width)}{'n':>5}{'p50 ms':>12}{'p95 ms':>12}")
+    for name, row in summary.items():
+        print(f"{name.ljust(width)}{row['n']:>5}{row['p50_ms']:>12.1f}{row['p95_ms']:>12.1f}")
+
+
+async def run(args) -> Dict[str, Dict[str, float]]:
+    with NotionStubServer() as stub, tempfile.TemporaryDirectory(prefix="softlight-bench-") as workdir:
+        configure_environment(stub.base_url, workdir)
+
+        from app.utils.config import settings
+        from app.utils.log import setup_logging
+
+        setup_logging(settings.LOG_LEVEL, "text")
+        fake = install_fake_llm(args.llm_latency)
+
+        samples = defaultdict(list)
+        if not args.skip_execute:
+            print(f"execute_steps: {len(SCENARIOS)} scenarios x {args.iterations} iterations")
+            samples.update(await bench_execute_steps(args.iterations, args.warm_cache))
+        print("page probes: analyze_page and state detection")
+        samples.update(await bench_page_probes(stub, args.iterations))
+
+        summary = summarize(samples)
+        summary["llm_calls"] = {"n": fake.calls, "p50_ms": 0.0, "p95_ms": 0.0}
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Simulated LLM latency in seconds")
+    parser.add_argument("--warm-cache", action="store_true", help="Keep the plan cache between iterations")
+    parser.add_argument("--skip-execute", action="store_true", help="Only run the page probes")
+    parser.add_argument("--json", help="Write the summary to this file")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(args))
+    print_report(summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import pytest
+
+from app.services import adaptive_timeouts as adaptive_module
+from app.services.adaptive_timeouts import AdaptiveTimeouts, strategy_key, url_pattern
+from app.utils.config import settings
+
+URL = "https://www.notion.so/acme/Roadmap-0123456789abcdef0123456789abcdef"
+
+
+class TimeoutError(Exception):
+    """Stands in for Playwright's TimeoutError, which is matched by name"""
+
+
+@pytest.fixture
+def timeouts(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ADAPTIVE_TIMEOUTS_ENABLED", True)
+    monkeypatch.setattr(settings, "ADAPTIVE_TIMEOUT_PERCENTILE", 0.99)
+    monkeypatch.setattr(settings, "ADAPTIVE_TIMEOUT_MARGIN", 1.5)
+    monkeypatch.setattr(settings, "ADAPTIVE_TIMEOUT_MIN_SAMPLES", 20)
+    monkeypatch.setattr(settings, "ADAPTIVE_TIMEOUT_FLOOR_MS", 1000.0)
+    monkeypatch.setattr(settings, "ADAPTIVE_TIMEOUT_CEILING_MS", 60000.0)
+    return AdaptiveTimeouts(str(tmp_path / "timeout_stats.json"))
+
+
+def observe_many(timeouts, key, elapsed_ms, count, timed_out=False):
+    for _ in range(count):
+        timeouts.observe("click", key, URL, elapsed_ms, timed_out=timed_out)
+
+
+def test_url_pattern_collapses_ids_and_workspaces():
+    assert url_pattern(URL) == "www.notion.so/:workspace/:page"
+    assert url_pattern("https://www.notion.so/login") == "www.notion.so/login"
+    assert url_pattern("https://www.notion.so/acme/42") == "www.notion.so/:workspace/:n"
+    assert url_pattern("") == "unknown"
+
+
+def test_strategy_key_normalizes_selector():
+    assert strategy_key("text", "  Meeting   Notes 12 ") == "text:meeting notes #"
+    assert strategy_key("css", "[aria-label*='Search']") != strategy_key("css", "[aria-label*='New']")
+
+
+def test_default_until_enough_samples(timeouts):
+    key = strategy_key("css", "#search")
+    observe_many(timeouts, key, 200, settings.ADAPTIVE_TIMEOUT_MIN_SAMPLES - 1)
+
+    assert timeouts.timeout_ms("click", key, URL, 10000) == 10000
+
+
+def test_learns_percentile_with_margin_clamped_to_floor_and_ceiling(timeouts):
+    fast = strategy_key("css", "#fast")
+    medium = strategy_key("css", "#medium")
+    slow = strategy_key("css", "#slow")
+    observe_many(timeouts, fast, 20, 30)
+    observe_many(timeouts, medium, 2000, 30)
+    observe_many(timeouts, slow, 500000, 30)
+
+    assert timeouts.timeout_ms("click", fast, URL, 10000) == settings.ADAPTIVE_TIMEOUT_FLOOR_MS
+    assert 2000 * 1.5 <= timeouts.timeout_ms("click", medium, URL, 10000) <= 2000 * 1.25 * 1.5
+    assert timeouts.timeout_ms("click", slow, URL, 10000) == settings.ADAPTIVE_TIMEOUT_CEILING_MS
+
+
+def test_selectors_are_learned_separately(timeouts):
+    fast = strategy_key("css", "#fast")
+    observe_many(timeouts, fast, 20, 30)
+
+    assert timeouts.timeout_ms("click", strategy_key("css", "#other"), URL, 10000) == 10000
+
+
+def test_mostly_hit_selector_shrinks_despite_misses(timeouts):
+    key = strategy_key("text", "New page")
+    learned = []
+    for attempt in range(300):
+        timeout = timeouts.timeout_ms("click", key, URL, 10000)
+        learned.append(timeout)
+        if attempt % 10 == 9:
+            timeouts.observe("click", key, URL, timeout, timed_out=True)
+        else:
+            timeouts.observe("click", key, URL, 150)
+
+    assert learned[0] == 10000
+    assert learned[-1] == settings.ADAPTIVE_TIMEOUT_FLOOR_MS
+
+
+def test_always_missing_selector_fails_fast(timeouts):
+    key = strategy_key("css", "[data-testid='fallback']")
+    for _ in range(40):
+        timeouts.observe("click", key, URL, timeouts.timeout_ms("click", key, URL, 10000), timed_out=True)
+
+    assert timeouts.timeout_ms("click", key, URL, 10000) == settings.ADAPTIVE_TIMEOUT_FLOOR_MS
+
+
+def test_timeouts_at_the_window_edge_raise_it(timeouts):
+    key = strategy_key("css", "#slow-tail")
+    observe_many(timeouts, key, 1500, 200)
+    window = timeouts.timeout_ms("click", key, URL, 10000)
+    observe_many(timeouts, key, window * 0.9, 1)
+    assert timeouts.timeout_ms("click", key, URL, 10000) == window
+
+    observe_many(timeouts, key, window, 5, timed_out=True)
+
+    assert timeouts.timeout_ms("click", key, URL, 10000) > window
+
+
+def test_successes_can_exceed_default(timeouts):
+    key = strategy_key("css", "#slow-success")
+    observe_many(timeouts, key, 20000, 30)
+
+    assert timeouts.timeout_ms("click", key, URL, 10000) > 10000
+
+
+def test_track_records_successes_and_censored_timeouts(timeouts):
+    key = strategy_key("css", "#tracked")
+    with timeouts.track("click", key, URL):
+        pass
+    with pytest.raises(TimeoutError):
+        with timeouts.track("click", key, URL):
+            raise TimeoutError()
+    with pytest.raises(ValueError):
+        with timeouts.track("click", key, URL):
+            raise ValueError()
+
+    [row] = timeouts.stats()
+    assert (row["strategy"], row["samples"], row["timeouts"]) == (key, 2, 1)
+
+
+def test_disabled_records_nothing_and_uses_default(timeouts, monkeypatch):
+    monkeypatch.setattr(settings, "ADAPTIVE_TIMEOUTS_ENABLED", False)
+    key = strategy_key("css", "#x")
+    observe_many(timeouts, key, 20, 30)
+
+    assert timeouts.stats() == []
+    assert timeouts.timeout_ms("click", key, URL, 10000) == 10000
+
+
+def test_stats_persist_across_instances(timeouts):
+    key = strategy_key("css", "#persisted")
+    observe_many(timeouts, key, 2000, 25)
+    observe_many(timeouts, key, 3000, 5, timed_out=True)
+    timeouts.flush()
+
+    reloaded = AdaptiveTimeouts(timeouts.stats_path)
+
+    assert reloaded.stats() == timeouts.stats()
+    assert reloaded.timeout_ms("click", key, URL, 10000) == timeouts.timeout_ms("click", key, URL, 10000)
+
+
+def test_save_failures_do_not_escape_track(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ADAPTIVE_TIMEOUTS_ENABLED", True)
+    monkeypatch.setattr(adaptive_module, "SAVE_EVERY", 1)
+    blocked = tmp_path / "not-a-directory"
+    blocked.write_text("")
+    timeouts = AdaptiveTimeouts(str(blocked / "timeout_stats.json"))
+
+    with timeouts.track("click", strategy_key("css", "#x"), URL):
+        pass
+
+    assert timeouts.stats()[0]["samples"] == 1
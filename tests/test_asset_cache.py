@@ -0,0 +1,113 @@
+import os
+
+import pytest
+
+from app.services.asset_cache import AssetCache
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "asset_cache")
+
+
+def blobs(cache_dir):
+    return sorted(os.listdir(os.path.join(cache_dir, "blobs")))
+
+
+def test_is_cacheable_only_for_hashed_static_assets(cache_dir):
+    cache = AssetCache(cache_dir, 1024)
+
+    assert cache.is_cacheable("https://www.notion.so/_assets/app-3f2a.js", "script")
+    assert cache.is_cacheable("https://cdn.example.com/main.0123abcd.css", "stylesheet")
+    assert not cache.is_cacheable("https://www.notion.so/api/v3/loadPage", "fetch")
+    assert not cache.is_cacheable("https://cdn.example.com/main.css", "stylesheet")
+
+
+def test_round_trip_keeps_only_needed_headers(cache_dir):
+    cache = AssetCache(cache_dir, 1024)
+
+    cache.put("u1", b"body", {"Content-Type": "text/javascript", "Content-Encoding": "br"})
+
+    assert cache.get("u1") == {"body": b"body", "headers": {"Content-Type": "text/javascript"}}
+    assert cache.get("missing") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"], stats["bytes"]) == (1, 1, 1, 4)
+
+
+def test_identical_bodies_share_one_blob(cache_dir):
+    cache = AssetCache(cache_dir, 1024)
+
+    cache.put("u1", b"same", {})
+    cache.put("u2", b"same", {})
+
+    assert len(blobs(cache_dir)) == 1
+    assert cache.stats()["bytes"] == 4
+
+
+def test_rejects_bodies_larger_than_the_cache(cache_dir):
+    cache = AssetCache(cache_dir, 10)
+
+    cache.put("u1", b"x" * 11, {})
+
+    assert cache.get("u1") is None
+
+
+def test_evicts_least_recently_used(cache_dir):
+    cache = AssetCache(cache_dir, 250)
+    cache.put("u1", b"1" * 100, {})
+    cache.put("u2", b"2" * 100, {})
+    assert cache.get("u1") is not None
+    cache.flush()
+
+    cache.put("u3", b"3" * 100, {})
+
+    assert cache.get("u2") is None
+    assert cache.get("u1") is not None
+    assert cache.get("u3") is not None
+    assert cache.stats()["evictions"] == 1
+    assert len(blobs(cache_dir)) == 2
+
+
+def test_shared_blob_survives_eviction_of_one_url(cache_dir):
+    cache = AssetCache(cache_dir, 250)
+    cache.put("u1", b"s" * 100, {})
+    cache.put("u2", b"t" * 100, {})
+    cache.put("u3", b"s" * 100, {})
+
+    cache.put("u4", b"u" * 100, {})
+
+    # u1 goes first but frees nothing while u3 references the same blob, so u2 goes too.
+    assert cache.get("u1") is None
+    assert cache.get("u2") is None
+    assert cache.get("u3") == {"body": b"s" * 100, "headers": {}}
+    assert cache.stats()["bytes"] == 200
+
+
+def test_instances_share_one_directory(cache_dir):
+    writer = AssetCache(cache_dir, 1024)
+    reader = AssetCache(cache_dir, 1024)
+
+    writer.put("u1", b"body", {})
+
+    assert reader.get("u1")["body"] == b"body"
+
+
+def test_eviction_in_one_instance_is_seen_by_another(cache_dir):
+    first = AssetCache(cache_dir, 150)
+    second = AssetCache(cache_dir, 150)
+    first.put("u1", b"1" * 100, {})
+
+    second.put("u2", b"2" * 100, {})
+
+    assert first.get("u1") is None
+    assert first.get("u2") is not None
+
+
+def test_missing_blob_counts_as_miss_and_drops_entry(cache_dir):
+    cache = AssetCache(cache_dir, 1024)
+    cache.put("u1", b"body", {})
+    for name in blobs(cache_dir):
+        os.remove(os.path.join(cache_dir, "blobs", name))
+
+    assert cache.get("u1") is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from app.models.task_models import BatchTaskRequest, JobRequest, MacroReplayRequest, TaskRequest
+from app.utils.deadline import Deadline, DeadlineExceeded, budget_ms, budget_seconds, check_deadline, set_deadline
+
+
+def test_timeout_shrinks_to_remaining_budget():
+    deadline = Deadline(2.0)
+
+    assert deadline.timeout_ms(500) == 500
+    assert 1900 < deadline.timeout_ms(10000) <= 2000
+
+
+def test_expired_deadline_raises():
+    deadline = Deadline(0.0)
+
+    assert deadline.expired
+    with pytest.raises(DeadlineExceeded):
+        deadline.timeout_ms(1000)
+
+
+def test_budget_applies_only_inside_a_task_with_a_deadline():
+    async def with_deadline():
+        set_deadline(1.0)
+        check_deadline()
+        return budget_ms(30000), budget_seconds(30)
+
+    async def without_deadline():
+        return budget_ms(30000), budget_seconds(30)
+
+    limited_ms, limited_seconds = asyncio.run(with_deadline())
+    assert limited_ms <= 1000
+    assert limited_seconds <= 1.0
+    assert asyncio.run(without_deadline()) == (30000, 30)
+
+
+def test_spawned_tasks_inherit_the_deadline():
+    async def child():
+        check_deadline()
+
+    async def run():
+        set_deadline(0.0)
+        await asyncio.create_task(child())
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(run())
+
+
+@pytest.mark.parametrize("model", [TaskRequest, BatchTaskRequest, MacroReplayRequest, JobRequest])
+def test_requests_reject_non_positive_deadlines(model):
+    fields = {"app": "Notion", "instruction": "x", "instructions": ["x"]}
+    known = {name: value for name, value in fields.items() if name in model.model_fields}
+
+    assert model(**known).deadline_seconds is None
+    assert model(**known, deadline_seconds=0.5).deadline_seconds == 0.5
+    for invalid in (0, -5):
+        with pytest.raises(ValidationError):
+            model(**known, deadline_seconds=invalid)
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from app.services.input_engine import INPUT_MODES, InputEngine
+
+
+class FakeKeyboard:
+    def __init__(self, field):
+        self.field = field
+
+    async def press(self, key):
+        if key == "Backspace":
+            self.field.text = ""
+
+    async def insert_text(self, value):
+        if "insert" in self.field.working_modes:
+            self.field.text = value
+
+
+class FakeField:
+    def __init__(self, editable, working_modes):
+        self.editable = editable
+        self.working_modes = working_modes
+        self.text = ""
+
+    async def evaluate(self, script):
+        return self.editable if script == "(el) => el.isContentEditable" else self.text
+
+    async def click(self):
+        pass
+
+    async def fill(self, value):
+        if "fill" in self.working_modes:
+            self.text = value
+
+    async def press_sequentially(self, value, delay):
+        if "type" in self.working_modes:
+            self.text = value
+
+
+class FakePage:
+    def __init__(self, field):
+        self.keyboard = FakeKeyboard(field)
+
+
+def outcomes(mode):
+    return {
+        outcome: INPUT_MODES._values.get(tuple(sorted({"mode": mode, "outcome": outcome}.items())), 0)
+        for outcome in ("ok", "retry", "failed")
+    }
+
+
+def fill(engine, field):
+    return asyncio.run(engine.fill_element(FakePage(field), field, "Roadmap"))
+
+
+@pytest.mark.parametrize("editable, expected", [(True, "insert"), (False, "fill")])
+def test_auto_picks_mode_by_element(editable, expected):
+    field = FakeField(editable, {"insert", "fill"})
+
+    assert fill(InputEngine("auto"), field) == expected
+    assert field.text == "Roadmap"
+
+
+def test_falls_back_to_typing():
+    field = FakeField(True, {"type"})
+
+    assert fill(InputEngine("auto", typing_delay_ms=0), field) == "type"
+
+
+def test_failure_is_counted_against_the_mode_tried_last():
+    insert_before, type_before = outcomes("insert"), outcomes("type")
+
+    with pytest.raises(ValueError, match="mode: type"):
+        fill(InputEngine("auto", typing_delay_ms=0), FakeField(True, set()))
+
+    insert_after, type_after = outcomes("insert"), outcomes("type")
+    assert insert_after["retry"] == insert_before["retry"] + 1
+    assert insert_after["failed"] == insert_before["failed"]
+    assert type_after["failed"] == type_before["failed"] + 1
+
+
+def test_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        InputEngine("paste")
@@ -0,0 +1,144 @@
+import time
+
+import pytest
+
+from app.services.job_queue import JobQueue
+from app.utils.config import settings
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "WORKER_TIMEOUT_SECONDS", 30.0)
+    monkeypatch.setattr(settings, "AFFINITY_WAIT_SECONDS", 30.0)
+    monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 3)
+    return JobQueue(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_claims_in_arrival_order(queue):
+    first = queue.enqueue("Notion", "first")
+    second = queue.enqueue("Notion", "second")
+
+    assert queue.claim("w1", [])["id"] == first["id"]
+    assert queue.claim("w1", [])["id"] == second["id"]
+    assert queue.claim("w1", []) is None
+
+
+def test_claim_marks_job_running(queue):
+    job = queue.enqueue("Notion", "x")
+
+    claimed = queue.claim("w1", [])
+
+    assert claimed["id"] == job["id"]
+    assert claimed["status"] == "running"
+    assert claimed["worker_id"] == "w1"
+    assert claimed["attempts"] == 1
+
+
+def test_warm_worker_takes_its_workspace_first(queue):
+    queue.enqueue("Notion", "cold", workspace="other")
+    warm = queue.enqueue("Notion", "warm", workspace="acme")
+
+    assert queue.claim("w1", ["acme"])["id"] == warm["id"]
+
+
+def test_cold_worker_leaves_job_for_live_warm_worker(queue):
+    queue.heartbeat("warm-worker", 1, 1, ["acme"])
+    queue.enqueue("Notion", "x", workspace="acme")
+
+    assert queue.claim("cold-worker", []) is None
+
+
+def test_cold_worker_takes_job_after_affinity_wait(queue, monkeypatch):
+    queue.heartbeat("warm-worker", 1, 1, ["acme"])
+    job = queue.enqueue("Notion", "x", workspace="acme")
+    monkeypatch.setattr(settings, "AFFINITY_WAIT_SECONDS", 0.0)
+
+    assert queue.claim("cold-worker", [])["id"] == job["id"]
+
+
+def test_job_for_workspace_nobody_holds_goes_to_any_worker(queue):
+    job = queue.enqueue("Notion", "x", workspace="acme")
+
+    assert queue.claim("w1", [])["id"] == job["id"]
+
+
+def test_claim_skips_busy_workspaces(queue):
+    queue.enqueue("Notion", "busy", workspace="acme")
+    free = queue.enqueue("Notion", "free", workspace="globex")
+
+    assert queue.claim("w1", ["acme"], busy_workspaces={"acme"})["id"] == free["id"]
+
+
+def test_complete_and_fail_store_outcome(queue):
+    done = queue.enqueue("Notion", "a")
+    broken = queue.enqueue("Notion", "b")
+    queue.claim("w1", [])
+    queue.claim("w1", [])
+
+    assert queue.complete(done["id"], "w1", {"status": "completed"})
+    assert queue.fail(broken["id"], "w1", "boom", {"status": "failed"})
+
+    assert queue.get(done["id"])["status"] == "completed"
+    assert queue.get(done["id"])["result"] == {"status": "completed"}
+    failed = queue.get(broken["id"])
+    assert (failed["status"], failed["error"], failed["result"]) == ("failed", "boom", {"status": "failed"})
+
+
+def test_requeues_jobs_of_unresponsive_workers(queue, monkeypatch):
+    job = queue.enqueue("Notion", "x")
+    queue.heartbeat("w1", 1, 1, [])
+    queue.claim("w1", [])
+
+    assert queue.requeue_stale() == 0
+
+    monkeypatch.setattr(settings, "WORKER_TIMEOUT_SECONDS", 0.01)
+    time.sleep(0.02)
+    assert queue.requeue_stale() == 1
+    requeued = queue.get(job["id"])
+    assert (requeued["status"], requeued["worker_id"]) == ("queued", None)
+    assert queue.live_workers() == []
+
+
+def test_late_outcome_of_requeued_job_is_dropped(queue, monkeypatch):
+    job = queue.enqueue("Notion", "x")
+    queue.claim("slow-worker", [])
+    monkeypatch.setattr(settings, "WORKER_TIMEOUT_SECONDS", 0.01)
+    time.sleep(0.02)
+    queue.requeue_stale()
+    queue.claim("new-worker", [])
+
+    assert not queue.complete(job["id"], "slow-worker", {"status": "completed"})
+    assert not queue.fail(job["id"], "slow-worker", "boom")
+    running = queue.get(job["id"])
+    assert (running["status"], running["worker_id"], running["result"]) == ("running", "new-worker", None)
+
+    assert queue.complete(job["id"], "new-worker", {"status": "completed"})
+    assert not queue.fail(job["id"], "new-worker", "again")
+    assert queue.get(job["id"])["status"] == "completed"
+
+
+def test_fails_job_after_max_attempts(queue, monkeypatch):
+    job = queue.enqueue("Notion", "x")
+    monkeypatch.setattr(settings, "WORKER_TIMEOUT_SECONDS", 0.01)
+
+    for attempt in range(1, settings.JOB_MAX_ATTEMPTS + 1):
+        assert queue.claim(f"w{attempt}", [])["attempts"] == attempt
+        time.sleep(0.02)
+        queue.requeue_stale()
+
+    failed = queue.get(job["id"])
+    assert failed["status"] == "failed"
+    assert "3 attempts" in failed["error"]
+    assert queue.claim("w9", []) is None
+
+
+def test_live_workers_reports_heartbeats(queue):
+    queue.heartbeat("w1", 4, 1, ["b", "a"])
+    queue.deregister("w2")
+
+    [worker] = queue.live_workers()
+    assert (worker["id"], worker["capacity"], worker["active"]) == ("w1", 4, 1)
+    assert worker["warm_workspaces"] == ["a", "b"]
+
+    queue.deregister("w1")
+    assert queue.live_workers() == []
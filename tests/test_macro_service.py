@@ -0,0 +1,27 @@
+from app.services.macro_service import MacroService
+
+STEPS = [
+    {"action": "click", "selector_hint": "New page", "description": "open"},
+    {"action": "fill", "selector_hint": "Untitled", "description": "name", "value": "Roadmap"},
+    {"action": "click", "selector_hint": "Retry", "description": "recover", "recovered": True},
+]
+
+
+def test_records_into_its_directory_and_binds_params(tmp_path):
+    macros = MacroService(str(tmp_path / "macros"))
+
+    macros.record("new_page", "Notion", "Create a page", STEPS)
+
+    assert (tmp_path / "macros" / "new_page.json").exists()
+    assert [m["name"] for m in MacroService(str(tmp_path / "macros")).list_macros()] == ["new_page"]
+    macro = macros.load("new_page")
+    assert macro["params"] == {"untitled": "Roadmap"}
+    assert [step["value"] for step in macros.bind(macro, {"untitled": "Q3"})] == [None, "Q3"]
+    assert [step["value"] for step in macros.bind(macro)] == [None, "Roadmap"]
+
+
+def test_missing_directory_has_no_macros(tmp_path):
+    macros = MacroService(str(tmp_path / "missing"))
+
+    assert macros.list_macros() == []
+    assert macros.load("new_page") is None
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from app.utils import metrics
+from app.utils.metrics import MetricsRegistry, span, start_task_timings, strategy_span
+
+
+def series(histogram, **labels):
+    return histogram._values[tuple(sorted(labels.items()))]
+
+
+def observed(histogram, **labels):
+    values = histogram._values.get(tuple(sorted(labels.items())))
+    return values[-1] if values else 0
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = MetricsRegistry().histogram("h", "help", buckets=(1.0, 0.1, 10.0))
+
+    for value in (0.05, 0.5, 5.0, 50.0):
+        histogram.observe(value, phase="x")
+
+    *buckets, total, count = series(histogram, phase="x")
+    assert histogram.buckets == (0.1, 1.0, 10.0)
+    assert buckets == [1, 2, 3]
+    assert (round(total, 2), count) == (55.55, 4)
+
+
+def test_render_uses_prometheus_text_format():
+    registry = MetricsRegistry()
+    counter = registry.counter("c_total", "Counted things.")
+    histogram = registry.histogram("h_seconds", "Timed things.", buckets=(0.5,))
+    counter.inc(outcome="hit")
+    counter.inc(2, outcome="hit")
+    counter.inc(outcome='say "miss"')
+    histogram.observe(0.25, phase="nav")
+
+    assert registry.render() == "\n".join([
+        "# HELP c_total Counted things.",
+        "# TYPE c_total counter",
+        'c_total{outcome="hit"} 3',
+        "c_total{outcome=\"say 'miss'\"} 1",
+        "# HELP h_seconds Timed things.",
+        "# TYPE h_seconds histogram",
+        'h_seconds_bucket{phase="nav",le="0.5"} 1',
+        'h_seconds_bucket{phase="nav",le="+Inf"} 1',
+        'h_seconds_sum{phase="nav"} 0.250000',
+        'h_seconds_count{phase="nav"} 1',
+    ]) + "\n"
+
+
+def test_span_adds_to_task_timings_and_phase_histogram():
+    before = observed(metrics.PHASE_SECONDS, phase="test_phase")
+
+    async def run():
+        timings = start_task_timings()
+        with span("test_phase"):
+            pass
+        with pytest.raises(RuntimeError):
+            with span("test_phase"):
+                raise RuntimeError()
+        return timings
+
+    timings = asyncio.run(run())
+
+    assert set(timings) == {"test_phase"}
+    assert timings["test_phase"] >= 0
+    assert observed(metrics.PHASE_SECONDS, phase="test_phase") == before + 2
+
+
+def test_span_outside_a_task_only_records_the_histogram():
+    async def run():
+        with span("untracked_phase"):
+            pass
+        return metrics._task_timings.get()
+
+    assert asyncio.run(run()) is None
+    assert observed(metrics.PHASE_SECONDS, phase="untracked_phase") >= 1
+
+
+def test_strategy_span_counts_hits_and_misses():
+    attempts = metrics.STRATEGY_ATTEMPTS._values
+
+    def count(outcome):
+        return attempts.get(tuple(sorted({"action": "click", "strategy": "test", "outcome": outcome}.items())), 0)
+
+    hits, misses = count("hit"), count("miss")
+
+    async def run():
+        timings = start_task_timings()
+        with strategy_span("click", "test"):
+            pass
+        with pytest.raises(TimeoutError):
+            with strategy_span("click", "test"):
+                raise TimeoutError()
+        return timings
+
+    timings = asyncio.run(run())
+
+    assert (count("hit"), count("miss")) == (hits + 1, misses + 1)
+    assert "strategy_attempts" in timings
+    assert observed(metrics.STRATEGY_SECONDS, action="click", strategy="test") >= 2
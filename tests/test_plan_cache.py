@@ -0,0 +1,46 @@
+from app.utils import plan_cache
+from app.utils.plan_cache import PlanCache
+
+STEPS = [{"action": "click", "selector_hint": "New page"}]
+
+
+def test_returns_copies():
+    cache = PlanCache(max_size=4, ttl_seconds=60)
+    cache.put("key", STEPS)
+
+    cached = cache.get("key")
+    cached[0]["action"] = "fill"
+
+    assert cache.get("key") == STEPS
+
+
+def test_evicts_least_recently_used():
+    cache = PlanCache(max_size=2, ttl_seconds=60)
+    cache.put("a", STEPS)
+    cache.put("b", STEPS)
+    cache.get("a")
+
+    cache.put("c", STEPS)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == STEPS
+    assert len(cache) == 2
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(plan_cache.time, "monotonic", lambda: now[0])
+    cache = PlanCache(max_size=4, ttl_seconds=10)
+    cache.put("key", STEPS)
+
+    now[0] += 9
+    assert cache.get("key") == STEPS
+    now[0] += 1
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_disabled_cache_stores_nothing():
+    for cache in (PlanCache(max_size=0, ttl_seconds=60), PlanCache(max_size=4, ttl_seconds=0)):
+        cache.put("key", STEPS)
+        assert cache.get("key") is None
@@ -0,0 +1,35 @@
+import asyncio
+import time
+
+from app.utils.rate_limiter import TokenBucket
+
+
+def test_burst_up_to_capacity_then_waits_for_refill():
+    async def run():
+        bucket = TokenBucket(rate_per_second=20, capacity=3)
+        started = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        burst = time.monotonic() - started
+        await bucket.acquire()
+        return burst, time.monotonic() - started
+
+    burst, total = asyncio.run(run())
+
+    assert burst < 0.03
+    assert total >= 0.045
+
+
+def test_waiters_are_served_in_arrival_order():
+    async def run():
+        bucket = TokenBucket(rate_per_second=50, capacity=1)
+        served = []
+
+        async def request(n):
+            await bucket.acquire()
+            served.append(n)
+
+        await asyncio.gather(*(request(n) for n in range(5)))
+        return served
+
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4]
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.task_models import BatchTaskResponse, BatchTaskResult, BatchTiming, Step, TaskResponse
+from app.utils.responses import dedupe_page_states, parse_shaping, shaped_response
+
+HOME = {"url": "https://www.notion.so/ws", "interactive_elements": [{"text": "Search"}, {"text": "New page"}]}
+MENU = {"url": "https://www.notion.so/ws", "interactive_elements": [{"text": "Search"}, {"text": "Database"}]}
+
+
+def raw_steps():
+    return [
+        {"action": "click", "selector_hint": "More options", "description": "open", "page_state": HOME},
+        {"action": "click", "selector_hint": "Database", "description": "create", "page_state": MENU},
+        {"action": "fill", "selector_hint": "Untitled", "description": "name", "value": "Roadmap", "page_state": MENU},
+        {"action": "error", "selector_hint": "deadline", "description": "deadline exceeded"},
+    ]
+
+
+def task_response():
+    slim_steps, page_states = dedupe_page_states(raw_steps())
+    return TaskResponse(
+        status="completed", app="Notion", instruction="x",
+        steps=[Step(**step) for step in slim_steps], page_states=page_states,
+    )
+
+
+def body(response):
+    return json.loads(response.body)
+
+
+def test_dedupe_keeps_each_distinct_state_once():
+    slim_steps, page_states = dedupe_page_states(raw_steps())
+
+    assert len(page_states) == 2
+    assert [s.get("page_state_id") for s in slim_steps[:3]] == [
+        slim_steps[0]["page_state_id"], slim_steps[1]["page_state_id"], slim_steps[1]["page_state_id"]
+    ]
+    assert slim_steps[0]["page_state_id"] != slim_steps[1]["page_state_id"]
+    assert page_states[slim_steps[1]["page_state_id"]] == MENU
+    assert all("page_state" not in step for step in slim_steps)
+    assert "page_state_id" not in slim_steps[3]
+
+
+def test_dedupe_ids_do_not_depend_on_key_order():
+    reordered = {"interactive_elements": MENU["interactive_elements"], "url": MENU["url"]}
+    _, first = dedupe_page_states([{"action": "click", "description": "a", "page_state": MENU}])
+    _, second = dedupe_page_states([{"action": "click", "description": "a", "page_state": reordered}])
+
+    assert first.keys() == second.keys()
+
+
+def test_unshaped_response_is_the_model_itself():
+    model = task_response()
+
+    assert shaped_response(model) is model
+
+
+def test_page_states_none_drops_table_and_ids():
+    shaped = body(shaped_response(task_response(), ["action"], "none"))
+
+    assert "page_states" not in shaped
+    assert shaped["steps"] == [{"action": "click"}, {"action": "click"}, {"action": "fill"}, {"action": "error"}]
+
+
+def test_page_states_ref_keeps_ids_with_selected_fields():
+    shaped = body(shaped_response(task_response(), ["action", "value"], "ref"))
+
+    assert len(shaped["page_states"]) == 2
+    assert set(shaped["steps"][0]) == {"action", "value", "page_state_id"}
+    assert shaped["page_states"][shaped["steps"][2]["page_state_id"]] == MENU
+
+
+def test_page_states_delta_expresses_later_states_as_changes():
+    shaped = body(shaped_response(task_response(), None, "delta"))
+    first_id = shaped["steps"][0]["page_state_id"]
+    second_id = shaped["steps"][1]["page_state_id"]
+
+    assert shaped["page_states"][first_id] == HOME
+    assert shaped["page_states"][second_id] == {
+        "base": first_id,
+        "delta": {"interactive_elements": {"added": [{"text": "Database"}], "removed": [{"text": "New page"}]}},
+    }
+
+
+def test_batch_results_are_shaped_individually():
+    result = task_response()
+    batch = BatchTaskResponse(
+        status="completed", app="Notion",
+        results=[BatchTaskResult(**result.model_dump(), duration_ms=1.0)],
+        timing=BatchTiming(planning_ms=1.0, execution_ms=1.0, total_ms=2.0),
+    )
+
+    shaped = body(shaped_response(batch, ["description"], "none"))
+
+    assert shaped["timing"]["total_ms"] == 2.0
+    assert shaped["results"][0]["steps"][0] == {"description": "open"}
+    assert "page_states" not in shaped["results"][0]
+
+
+def test_parse_shaping_validates_parameters():
+    assert parse_shaping(None, "none") is None
+    assert parse_shaping(" action, value ,", "ref") == ["action", "value"]
+
+    with pytest.raises(HTTPException) as unknown_field:
+        parse_shaping("action,bogus", "none")
+    assert unknown_field.value.status_code == 400
+
+    with pytest.raises(HTTPException) as unknown_mode:
+        parse_shaping(None, "full")
+    assert unknown_mode.value.status_code == 400
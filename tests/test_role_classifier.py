@@ -0,0 +1,27 @@
+from benchmarks.role_classifier import LABELS, corpus, legacy_role
+from app.services.role_classifier import RoleClassifier
+
+
+def test_matches_the_original_keyword_scans():
+    classifier = RoleClassifier(cache_size=128)
+
+    for text, aria_label, data_testid in LABELS + corpus(500, unique_share=0.3):
+        assert classifier.classify(text, aria_label, data_testid) == legacy_role(text, aria_label, data_testid)
+
+
+def test_overlapping_keywords_pick_highest_priority_role():
+    classifier = RoleClassifier(cache_size=0)
+
+    # "find" starts inside "findatabase" before "database"; the database role still wins.
+    assert classifier.classify("findatabase") == "database"
+    assert classifier.classify("Create page", "", "settings-button") == "settings"
+    assert classifier.classify("Close") == "interactive_element"
+
+
+def test_classify_many_sets_role_and_memoizes():
+    classifier = RoleClassifier(cache_size=16)
+    elements = [{"text": "New page"}, {"text": "New page"}, {"aria_label": "Search", "text": None}]
+
+    assert classifier.classify_many(elements) == ["create_action", "create_action", "search"]
+    assert [element["role"] for element in elements] == ["create_action", "create_action", "search"]
+    assert classifier.stats() == {"hits": 1, "misses": 2, "size": 2, "max_size": 16}
@@ -0,0 +1,46 @@
+import asyncio
+import base64
+import json
+import os
+
+from app.services.screencast import ScreencastRecorder
+
+
+class FakeCDPSession:
+    def __init__(self):
+        self.sent = []
+        self.detached = False
+
+    async def send(self, method, params=None):
+        await asyncio.sleep(0)
+        self.sent.append((method, params))
+
+    async def detach(self):
+        self.detached = True
+
+
+def frame(data: bytes, session_id: int):
+    return {"data": base64.b64encode(data).decode(), "sessionId": session_id}
+
+
+def test_every_frame_is_acknowledged_before_stop_returns(tmp_path):
+    async def run():
+        recorder = ScreencastRecorder(str(tmp_path), max_fps=0, quality=60)
+        recorder._writer = asyncio.create_task(recorder._write_frames())
+        recorder._cdp = cdp = FakeCDPSession()
+        for session_id, data in enumerate([b"a", b"a", b"b"]):
+            recorder._on_frame(frame(data, session_id))
+        assert len(recorder._acks) == 3
+
+        await recorder.stop()
+        return recorder, cdp
+
+    recorder, cdp = asyncio.run(run())
+
+    acked = sorted(params["sessionId"] for method, params in cdp.sent if method == "Page.screencastFrameAck")
+    assert acked == [0, 1, 2]
+    assert not recorder._acks
+    assert cdp.detached
+    assert [f["file"] for f in recorder.frames] == ["frame_00000.jpg", "frame_00001.jpg"]
+    with open(os.path.join(str(tmp_path), "manifest.json"), encoding="utf-8") as f:
+        assert len(json.load(f)["frames"]) == 2
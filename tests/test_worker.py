@@ -0,0 +1,29 @@
+from app.services.capture_service import LOGIN_MARKER, capture_service
+from app.utils.config import settings
+from app.worker import Worker
+
+
+def test_only_logged_in_profiles_are_warm(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "WORKSPACE_PROFILES_DIR", str(tmp_path))
+    for name in ("acme", "globex", "bad name"):
+        (tmp_path / name).mkdir()
+    (tmp_path / "acme" / LOGIN_MARKER).write_text("")
+    (tmp_path / "bad name" / LOGIN_MARKER).write_text("")
+
+    assert Worker("w1", 1).warm_workspaces() == ["acme"]
+
+
+def test_failed_login_clears_warmth(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "WORKSPACE_PROFILES_DIR", str(tmp_path))
+    (tmp_path / "acme").mkdir()
+
+    capture_service._set_logged_in("acme", True)
+    assert capture_service.is_logged_in("acme")
+    capture_service._set_logged_in("acme", False)
+    assert not capture_service.is_logged_in("acme")
+
+
+def test_missing_profiles_directory_means_nothing_is_warm(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "WORKSPACE_PROFILES_DIR", str(tmp_path / "missing"))
+
+    assert Worker("w1", 1).warm_workspaces() == []